@@ -0,0 +1,49 @@
+"""Append-only on-disk chat log with random access by message index.
+
+The GUI keeps only a window of recent messages in its text widget; the full
+conversation lives here. Each message is one JSON line ([tag, text]) and
+only its byte offset is kept in memory (8 bytes per message), so any range
+of older messages can be read back when the user scrolls up.
+"""
+
+import json
+import tempfile
+from array import array
+
+
+class ChatHistory:
+    def __init__(self, path=None):
+        # Without a path the log is a temporary file removed on close
+        if path is None:
+            self.file = tempfile.TemporaryFile(mode="w+b")
+        else:
+            self.file = open(path, "w+b")
+        self.offsets = array("q")
+        self.end = 0
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def append(self, tag, text):
+        """Store a message and return its index."""
+        data = json.dumps([tag, text], ensure_ascii=False).encode("utf-8") + b"\n"
+        self.file.seek(self.end)
+        self.file.write(data)
+        self.offsets.append(self.end)
+        self.end += len(data)
+        return len(self.offsets) - 1
+
+    def read(self, start, stop):
+        """Return [(tag, text), ...] for messages start <= index < stop."""
+        start = max(0, start)
+        stop = min(len(self.offsets), stop)
+        if start >= stop:
+            return []
+        self.file.flush()
+        self.file.seek(self.offsets[start])
+        end = self.offsets[stop] if stop < len(self.offsets) else self.end
+        chunk = self.file.read(end - self.offsets[start])
+        return [tuple(json.loads(line)) for line in chunk.splitlines()]
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,133 @@
+"""Load generator for chat_server.py.
+
+Opens `--connections` concurrent sessions, each sending `--requests`
+messages one after another (waiting for every reply), and reports
+requests/sec and latency percentiles.
+
+    python chat_server.py &
+    python chat_loadgen.py --connections 50 --requests 200
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+SAMPLE_MESSAGES = [
+    "hello there",
+    "how are you?",
+    "what's your name",
+    "what time is it",
+    "today's date please",
+    "tell me a joke",
+    "I have exams next week",
+    "I love python programming",
+    "thanks a lot",
+    "help",
+    "what is the meaning of life",
+    "sorry about that",
+]
+
+
+async def run_session(open_connection, requests, latencies, errors, rng):
+    """One session; failures, including a refused connection, go to `errors`.
+
+    Only the round trips of successful replies are added to `latencies`.
+    """
+    writer = None
+    try:
+        reader, writer = await open_connection()
+        for i in range(requests):
+            message = rng.choice(SAMPLE_MESSAGES)
+            start = time.perf_counter()
+            writer.write(json.dumps({"id": i, "message": message}).encode("utf-8") + b"\n")
+            await writer.drain()
+            line = await reader.readline()
+            elapsed = time.perf_counter() - start
+            if not line:
+                errors.append("connection closed")
+                return
+            reply = json.loads(line)
+            if "error" in reply:
+                errors.append(reply["error"])
+                return
+            latencies.append(elapsed)
+    except OSError as exc:
+        errors.append(str(exc) or type(exc).__name__)
+    finally:
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+async def run(args):
+    if args.unix:
+        def open_connection():
+            return asyncio.open_unix_connection(args.unix)
+    else:
+        def open_connection():
+            return asyncio.open_connection(args.host, args.port)
+
+    rng = random.Random(args.seed)
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_session(open_connection, args.requests, latencies, errors, random.Random(rng.random()))
+        for _ in range(args.connections)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    report = {
+        "connections": args.connections,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "elapsed_s": elapsed,
+        "requests_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": 1000 * percentile(latencies, 50),
+            "p95": 1000 * percentile(latencies, 95),
+            "p99": 1000 * percentile(latencies, 99),
+            "max": 1000 * latencies[-1],
+        } if latencies else {},
+    }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark a running chat_server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH")
+    parser.add_argument("--connections", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=100, help="requests per connection")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{report['requests']} requests over {report['connections']} connections "
+          f"in {report['elapsed_s']:.2f}s, {report['errors']} errors")
+    print(f"throughput: {report['requests_per_sec']:.0f} req/s")
+    if report["latency_ms"]:
+        lat = report["latency_ms"]
+        print(f"latency:    p50 {lat['p50']:.2f} ms, p95 {lat['p95']:.2f} ms, "
+              f"p99 {lat['p99']:.2f} ms, max {lat['max']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Replay chat transcripts through the chatbot engine in bulk.
+
+Reads messages from a file or stdin and streams one reply per message to
+stdout (or --output). Input is either plain text (one message per line) or
+JSONL with a "message" field; for JSONL every other field of the record is
+copied to the output record. Lines are processed in chunks, optionally
+across a pool of worker processes, with only a few chunks in flight at a
+time, so memory stays constant however long the input is. Output order
+always matches input order.
+
+    python chat_replay.py transcript.jsonl --format jsonl > replies.jsonl
+    cat messages.txt | python chat_replay.py --workers 4 --stats
+
+--profile prints per-intent timings to stderr at the end (in-process runs
+only: worker processes keep their own counters).
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from chatbot_engine import metrics, respond, use_rule_files
+
+
+def process_chunk(lines, input_format):
+    """Turn a list of raw input lines into a list of JSON output lines."""
+    out = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        if input_format == "jsonl":
+            try:
+                record = json.loads(line)
+                message = record["message"]
+            except (ValueError, KeyError, TypeError) as exc:
+                out.append(json.dumps({"error": f"bad record: {exc}", "line": line}, ensure_ascii=False))
+                continue
+        else:
+            record = {"message": line}
+            message = line
+        intent, response, confidence = respond(str(message))
+        record["intent"] = intent
+        record["response"] = response
+        record["confidence"] = round(confidence, 3)
+        out.append(json.dumps(record, ensure_ascii=False))
+    return out
+
+
+def chunked(lines, size):
+    it = iter(lines)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def replay(lines, input_format="text", chunk_size=5000, workers=0, rules=None):
+    """Yield lists of output lines, in input order.
+
+    `rules`: optional rule files to answer from instead of the built-in rules.
+    """
+    chunks = chunked(lines, chunk_size)
+    if rules:
+        use_rule_files(rules, poll_interval=None)
+    if workers <= 1:
+        for chunk in chunks:
+            yield process_chunk(chunk, input_format)
+        return
+
+    # Keep a bounded window of chunks in flight so input is read lazily
+    window = workers * 2
+    options = {"initializer": use_rule_files, "initargs": (rules, None)} if rules else {}
+    with ProcessPoolExecutor(max_workers=workers, **options) as pool:
+        pending = []
+        for chunk in chunks:
+            pending.append(pool.submit(process_chunk, chunk, input_format))
+            if len(pending) >= window:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay messages through the chatbot")
+    parser.add_argument("input", nargs="?", default="-", help="input file ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file ('-' for stdout)")
+    parser.add_argument("--format", choices=("text", "jsonl"), default=None,
+                        help="input format (default: jsonl for *.jsonl files, else text)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (0 = in-process)")
+    parser.add_argument("--rules", nargs="+", metavar="FILE",
+                        help="JSON/YAML rule files to use instead of the built-in rules")
+    parser.add_argument("--stats", action="store_true", help="print throughput to stderr")
+    parser.add_argument("--profile", action="store_true",
+                        help="print per-intent timings to stderr (requires --workers 0)")
+    args = parser.parse_args(argv)
+    if args.profile:
+        if args.workers > 1:
+            parser.error("--profile needs an in-process run (--workers 0)")
+        metrics.enabled = True
+
+    input_format = args.format or ("jsonl" if args.input.endswith(".jsonl") else "text")
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    count = 0
+    start = time.perf_counter()
+    try:
+        for out in replay(source, input_format, args.chunk_size, args.workers, args.rules):
+            if out:
+                sink.write("\n".join(out))
+                sink.write("\n")
+            count += len(out)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+        else:
+            sink.flush()
+
+    if args.stats:
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed if elapsed else 0.0
+        print(f"{count} messages in {elapsed:.2f}s ({rate:,.0f}/s, {rate * 60:,.0f}/min)", file=sys.stderr)
+    if args.profile:
+        print(metrics.summary(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Asyncio chatbot server speaking line-delimited JSON.
+
+Each request is one JSON object per line:
+    {"id": 1, "message": "hello"}
+and each reply is one JSON line:
+    {"id": 1, "intent": "greeting", "response": "Hello! ...", "confidence": 1.0, "session": "3f2a...", "turn": 1}
+
+Every connection is a session: the server counts its turns and closes it
+after the bot says goodbye. A connection has at most one message in
+flight: the next line is only read once the previous reply has been flushed
+to the socket, so a client that sends faster than it reads fills its own TCP
+buffers and stalls instead of growing server memory (backpressure). At most
+`--max-connections` clients are served at once; further clients get an
+error line and are disconnected. Matching a message takes microseconds, so
+it runs directly on the event loop.
+
+With --metrics-port the server also answers plain HTTP GETs on that port:
+/metrics (Prometheus text), /metrics.json, and /profile/on, /profile/off to
+toggle recording (see chatbot_metrics.py); --profile starts with it on.
+
+Run:
+    python chat_server.py --port 8765
+    python chat_server.py --unix /tmp/chatbot.sock
+    python chat_server.py --metrics-port 9100 --profile
+    python chat_server.py --rules rules.json     # reloaded when the file changes
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import uuid
+
+from chatbot_engine import metrics, respond, use_rule_files
+
+logger = logging.getLogger("chatbot.server")
+
+MAX_LINE_BYTES = 64 * 1024
+
+
+class Session:
+    def __init__(self, peer):
+        self.id = uuid.uuid4().hex[:12]
+        self.peer = peer
+        self.turns = 0
+        self.last_intent = None
+
+
+class ChatServer:
+    def __init__(self, max_connections=1000, idle_timeout=300.0):
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+
+    async def handle(self, reader, writer):
+        peer = writer.get_extra_info("peername") or "unix"
+        if len(self.sessions) >= self.max_connections:
+            await self._send(writer, {"error": "server busy, try again later"})
+            await close_writer(writer)
+            return
+
+        session = Session(peer)
+        self.sessions[session.id] = session
+        logger.debug("session %s opened from %s", session.id, peer)
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                except (asyncio.LimitOverrunError, ValueError):
+                    await self._send(writer, {"error": f"line longer than {MAX_LINE_BYTES} bytes"})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                reply = self.process(session, line)
+                await self._send(writer, reply)
+                if session.last_intent == "goodbye":
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            del self.sessions[session.id]
+            await close_writer(writer)
+            logger.debug("session %s closed after %d turns", session.id, session.turns)
+
+    def process(self, session, line):
+        try:
+            request = json.loads(line)
+            message = request["message"]
+            if not isinstance(message, str):
+                raise TypeError("message must be a string")
+        except (ValueError, KeyError, TypeError) as exc:
+            return {"error": f"bad request: {exc}"}
+
+        intent, response, confidence = respond(message)
+        session.turns += 1
+        session.last_intent = intent
+        return {
+            "id": request.get("id"),
+            "intent": intent,
+            "response": response,
+            "confidence": round(confidence, 3),
+            "session": session.id,
+            "turn": session.turns,
+        }
+
+    @staticmethod
+    async def _send(writer, payload):
+        writer.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        await writer.drain()
+
+
+async def close_writer(writer):
+    """Close a stream and wait until the transport is really gone."""
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except ConnectionError:
+        pass
+
+
+async def handle_metrics(reader, writer):
+    """Minimal HTTP/1.0 responder for the metrics endpoints."""
+    try:
+        request = await asyncio.wait_for(reader.readline(), 10)
+        while (await asyncio.wait_for(reader.readline(), 10)).strip():
+            pass
+        parts = request.decode("latin-1").split()
+        path = parts[1] if len(parts) > 1 else ""
+        status = "200 OK"
+        content_type = "application/json"
+        if path == "/metrics":
+            body = metrics.to_prometheus()
+            content_type = "text/plain; version=0.0.4"
+        elif path == "/metrics.json":
+            body = metrics.to_json()
+        elif path in ("/profile/on", "/profile/off"):
+            metrics.enabled = path.endswith("/on")
+            logger.info("profiling %s", "enabled" if metrics.enabled else "disabled")
+            body = json.dumps({"enabled": metrics.enabled})
+        else:
+            status = "404 Not Found"
+            body = json.dumps({"error": "not found"})
+        data = body.encode("utf-8")
+        writer.write(
+            f"HTTP/1.0 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data
+        )
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError, ValueError):
+        pass
+    finally:
+        await close_writer(writer)
+
+
+async def serve(host="127.0.0.1", port=8765, unix_path=None, metrics_port=None, **options):
+    server = ChatServer(**options)
+    if metrics_port:
+        await asyncio.start_server(handle_metrics, host, metrics_port)
+        logger.info("metrics on http://%s:%d/metrics", host, metrics_port)
+    if unix_path:
+        listener = await asyncio.start_unix_server(server.handle, path=unix_path, limit=MAX_LINE_BYTES)
+        logger.info("chatbot listening on unix:%s", unix_path)
+    else:
+        listener = await asyncio.start_server(server.handle, host, port, limit=MAX_LINE_BYTES)
+        logger.info("chatbot listening on %s:%d", host, port)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the chatbot over line-delimited JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--idle-timeout", type=float, default=300.0,
+                        help="close sessions idle for this many seconds")
+    parser.add_argument("--metrics-port", type=int, help="serve metrics over HTTP on this port")
+    parser.add_argument("--profile", action="store_true", help="record per-intent metrics from the start")
+    parser.add_argument("--slow-ms", type=float, default=metrics.slow_ms,
+                        help="log messages slower than this (default %(default)s)")
+    parser.add_argument("--rules", nargs="+", metavar="FILE",
+                        help="JSON/YAML rule files to use instead of the built-in rules")
+    parser.add_argument("--reload-interval", type=float, default=1.0,
+                        help="seconds between checks for rule file changes (0 = never)")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    metrics.slow_ms = args.slow_ms
+    if args.profile:
+        metrics.enabled = True
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format="%(asctime)s %(name)s: %(message)s")
+    if args.rules:
+        use_rule_files(args.rules, args.reload_interval)
+    try:
+        asyncio.run(serve(
+            args.host, args.port, args.unix, args.metrics_port,
+            max_connections=args.max_connections,
+            idle_timeout=args.idle_timeout,
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Response engine for the rule-based chatbot, independent of any GUI.
+
+Importing this module only defines the rules table; the matcher is compiled
+on the first call to respond() or get_matcher(). use_rule_files() switches
+to external, hot-reloadable rule files (see rule_loader.py).
+"""
+
+import os
+import time
+from datetime import datetime
+
+from chatbot_metrics import ResponseMetrics
+
+# ====== Rules table ======
+# Keywords are matched as whole words, tolerating small typos; the most
+# confident match answers, ties going to the earlier rule (or the lower
+# "priority"). "exact" phrases must be the whole message. Responses may use
+# {time} and {date}.
+RULES = [
+    {
+        "intent": "goodbye",
+        "exact": ["bye", "exit", "quit", "goodbye"],
+        "response": "Goodbye! It was nice talking to you. 👋",
+    },
+    {
+        "intent": "greeting",
+        "keywords": ["hello", "hi", "hey", "good morning", "good afternoon", "good evening"],
+        "response": "Hello! 😊 How can I help you today?",
+    },
+    {
+        "intent": "how_are_you",
+        "keywords": ["how are you"],
+        "response": "I'm just a bunch of Python code, but I'm feeling awesome! 😄 What about you?",
+    },
+    {
+        "intent": "name",
+        "keywords": ["your name", "who are you"],
+        "response": "I'm a simple rule-based chatbot built using Python and Tkinter.",
+    },
+    {
+        "intent": "creator",
+        "keywords": ["who created you", "your creator"],
+        "response": "I was created by a Python programmer as a mini chatbot project.",
+    },
+    {
+        "intent": "time",
+        "keywords": ["time"],
+        "response": "The current time is {time}.",
+    },
+    {
+        "intent": "date",
+        "keywords": ["date", "today's date"],
+        "response": "Today's date is {date}.",
+    },
+    {
+        "intent": "weather",
+        "keywords": ["weather"],
+        "response": "I can't fetch live weather yet, but I hope it's a pleasant day where you are! ☀️",
+    },
+    {
+        "intent": "thanks",
+        "keywords": ["thank you", "thanks"],
+        "response": "You're welcome! 😊 Happy to help.",
+    },
+    {
+        "intent": "sorry",
+        "keywords": ["sorry"],
+        "response": "It's okay, no worries at all. 💙",
+    },
+    {
+        "intent": "study",
+        "keywords": ["study", "exam", "exams"],
+        "response": (
+            "Stay consistent with your studies 📚. "
+            "Make a timetable, revise daily, and take short breaks. You've got this! 💪"
+        ),
+    },
+    {
+        "intent": "programming",
+        "keywords": ["programming", "coding", "python"],
+        "response": (
+            "Programming is fun! 🧑‍💻 Start with basics like variables, loops, and functions. "
+            "Practice small projects like calculators, to-do apps, or chatbots like me!"
+        ),
+    },
+    {
+        "intent": "joke",
+        "keywords": ["joke"],
+        "response": "Why do programmers prefer dark mode? Because light attracts bugs! 🐞😂",
+    },
+    {
+        "intent": "help",
+        "keywords": ["help"],
+        "response": (
+            "Sure! I can chat about:\n"
+            "- My name / who I am 🤖\n"
+            "- Time and date ⏰📅\n"
+            "- Study & exams 📚\n"
+            "- Programming & coding 🧑‍💻\n"
+            "- Jokes 😂\n"
+            "Just type what you want to talk about!"
+        ),
+    },
+]
+
+DEFAULT_RESPONSE = (
+    "I'm not sure how to respond to that yet. 🤔\n"
+    "Try asking me about the time, date, studies, coding, or say 'help' to see options."
+)
+
+# Matches scoring below this fall back to DEFAULT_RESPONSE
+CONFIDENCE_THRESHOLD = 0.75
+
+_matcher = None
+_rule_store = None
+
+# Per-intent counters and timings; toggle at runtime with metrics.enabled
+metrics = ResponseMetrics(enabled=bool(os.environ.get("CHATBOT_PROFILE")))
+
+
+def use_rule_files(paths, poll_interval=1.0):
+    """Answer from rule files instead of RULES, re-reading them when they change.
+
+    Raises if the files can't be loaded; later bad edits are logged and the
+    last good rules stay in use. poll_interval=None disables watching.
+    """
+    global _rule_store
+    from rule_loader import RuleStore
+    store = RuleStore(paths)
+    if poll_interval:
+        store.watch(poll_interval)
+    if _rule_store is not None:
+        _rule_store.stop()
+    _rule_store = store
+    return store
+
+
+def get_matcher():
+    global _matcher
+    if _rule_store is not None:
+        return _rule_store.matcher
+    if _matcher is None:
+        from fuzzy_matcher import FuzzyIntentMatcher
+        _matcher = FuzzyIntentMatcher(RULES)
+    return _matcher
+
+
+def render_response(template: str) -> str:
+    """Fill in {time} and {date}; any other braces are left as written."""
+    if "{" not in template:
+        return template
+    now = datetime.now()
+    return (template.replace("{time}", now.strftime("%I:%M %p"))
+            .replace("{date}", now.strftime("%d-%m-%Y")))
+
+
+def respond(user_input: str) -> tuple:
+    """Return (intent, response, confidence) for a message.
+
+    intent is None for the fallback reply; confidence is that of the best
+    match even when it falls below CONFIDENCE_THRESHOLD.
+    """
+    if not metrics.enabled:
+        return _respond(user_input)
+    start = time.perf_counter()
+    result = _respond(user_input)
+    metrics.record(result[0], user_input, time.perf_counter() - start, result[2])
+    return result
+
+
+def _respond(user_input):
+    rule, confidence = get_matcher().match(user_input)
+    if rule is None or confidence < CONFIDENCE_THRESHOLD:
+        return None, DEFAULT_RESPONSE, confidence
+    return rule["intent"], render_response(rule["response"]), confidence
+
+
+def get_bot_response(user_input: str) -> str:
+    return respond(user_input)[1]
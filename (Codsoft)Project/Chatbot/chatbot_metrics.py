@@ -0,0 +1,143 @@
+"""Optional latency instrumentation for the chatbot engine.
+
+chatbot_engine keeps one ResponseMetrics in `chatbot_engine.metrics`. It is
+off by default (respond() then pays a single attribute check); turn it on
+at any time with `metrics.enabled = True`, or at startup by setting the
+CHATBOT_PROFILE environment variable. While enabled it records, per intent
+(the fallback reply is reported as "none"):
+
+- how many messages it answered,
+- a histogram of time spent matching and rendering the reply,
+- messages slower than `slow_ms`, kept in a bounded log and also written
+  to the "chatbot.metrics" logger.
+
+Dump with as_dict() / to_json() or to_prometheus() (text exposition format).
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+# json and logging are imported on first use: chatbot_engine imports this
+# module unconditionally and they would double its import time.
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)
+
+
+class IntentStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)   # last one is +Inf
+
+
+class ResponseMetrics:
+    def __init__(self, enabled=False, slow_ms=5.0, slow_log_size=100):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.slow_log = deque(maxlen=slow_log_size)
+        self.intents = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, intent, message, elapsed, confidence=None):
+        """Record one reply; `elapsed` is in seconds."""
+        name = intent or "none"
+        with self._lock:
+            stats = self.intents.get(name)
+            if stats is None:
+                stats = self.intents[name] = IntentStats()
+            stats.count += 1
+            stats.total += elapsed
+            if elapsed > stats.max:
+                stats.max = elapsed
+            stats.buckets[bisect_left(BUCKETS, elapsed)] += 1
+
+        if 1000 * elapsed >= self.slow_ms:
+            entry = {
+                "time": time.time(),
+                "intent": name,
+                "ms": round(1000 * elapsed, 3),
+                "confidence": confidence,
+                "message": message[:200],
+            }
+            self.slow_log.append(entry)
+            import logging
+            logging.getLogger("chatbot.metrics").warning(
+                "slow message (%.2f ms, intent %s): %r", entry["ms"], name, entry["message"])
+
+    def reset(self):
+        with self._lock:
+            self.intents = {}
+            self.slow_log.clear()
+            self.started = time.time()
+
+    # ---- reporting ----
+
+    def as_dict(self):
+        with self._lock:
+            intents = {
+                name: {
+                    "count": stats.count,
+                    "total_ms": 1000 * stats.total,
+                    "mean_ms": 1000 * stats.total / stats.count,
+                    "max_ms": 1000 * stats.max,
+                    "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], stats.buckets)),
+                }
+                for name, stats in sorted(self.intents.items())
+            }
+        return {
+            "enabled": self.enabled,
+            "since": self.started,
+            "messages": sum(item["count"] for item in intents.values()),
+            "intents": intents,
+            "slow_ms": self.slow_ms,
+            "slow_messages": list(self.slow_log),
+        }
+
+    def to_json(self, **kwargs):
+        import json
+        return json.dumps(self.as_dict(), ensure_ascii=False, **kwargs)
+
+    def to_prometheus(self):
+        with self._lock:
+            items = sorted(self.intents.items())
+            lines = [
+                "# HELP chatbot_messages_total Messages answered, by intent.",
+                "# TYPE chatbot_messages_total counter",
+            ]
+            for name, stats in items:
+                lines.append(f'chatbot_messages_total{{intent="{name}"}} {stats.count}')
+
+            lines += [
+                "# HELP chatbot_response_seconds Time spent matching and rendering a reply.",
+                "# TYPE chatbot_response_seconds histogram",
+            ]
+            for name, stats in items:
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), stats.buckets):
+                    cumulative += count
+                    lines.append(f'chatbot_response_seconds_bucket{{intent="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'chatbot_response_seconds_sum{{intent="{name}"}} {stats.total:.9f}')
+                lines.append(f'chatbot_response_seconds_count{{intent="{name}"}} {stats.count}')
+
+        lines += [
+            "# HELP chatbot_slow_messages Slow messages currently in the slow log.",
+            "# TYPE chatbot_slow_messages gauge",
+            f"chatbot_slow_messages {len(self.slow_log)}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        data = self.as_dict()
+        if not data["messages"]:
+            return "no messages recorded"
+        rows = sorted(data["intents"].items(), key=lambda item: -item[1]["total_ms"])
+        text = [f"{data['messages']} messages, {len(data['slow_messages'])} slow (>= {self.slow_ms} ms)"]
+        for name, item in rows:
+            text.append(f"  {name:<14} {item['count']:>8} msgs  mean {item['mean_ms']:.3f} ms  "
+                        f"max {item['max_ms']:.3f} ms  total {item['total_ms']:.1f} ms")
+        return "\n".join(text)
@@ -0,0 +1,191 @@
+"""Token-based, typo-tolerant intent matcher for the chatbot.
+
+Messages and rule keywords are split into word tokens, so "hi" no longer
+fires inside "this". Each message token is looked up in the keyword
+vocabulary: exact hits directly, otherwise through an inverted index from
+character trigrams to vocabulary words, with candidates verified by a
+bounded edit distance (adjacent swaps count as one edit; none allowed when
+the longer word has 4 letters or less, since one edit there turns "date"
+into "data", "late" or "mate"; 1 up to 6 letters, 2 above). A keyword
+phrase matches when all of its tokens match consecutive message tokens;
+its confidence is the mean token similarity (1 - distance / length). Work
+per message depends on the message and on how many vocabulary words share
+its trigrams, not on the total number of rules.
+
+Rules use the chatbot_engine.RULES table format. `match`
+returns (rule, confidence) for the most confident rule, with ties going
+to the higher-priority rule, or (None, 0.0).
+"""
+
+import re
+from collections import defaultdict
+
+TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+# Cache fuzzy lookups of message words; cleared when it grows past this
+TOKEN_CACHE_SIZE = 50000
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def max_distance(length):
+    if length <= 4:
+        return 0
+    if length <= 6:
+        return 1
+    return 2
+
+
+def trigrams(word):
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_distance(a, b, limit):
+    """Edit distance between a and b, counting an adjacent swap as one edit.
+
+    Returns limit + 1 as soon as the distance is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                value = min(value, before[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyIntentMatcher:
+    def __init__(self, rules):
+        ranked = sorted(
+            enumerate(rules),
+            key=lambda item: (item[1].get("priority", item[0]), item[0])
+        )
+        self.rules = [rule for _, rule in ranked]
+
+        # first token -> [(rank, phrase tokens, whole_message)]
+        self.phrases = defaultdict(list)
+        vocabulary = set()
+        for rank, rule in enumerate(self.rules):
+            for keyword in rule.get("keywords", ()):
+                self._add_phrase(rank, tokenize(keyword), False, vocabulary)
+            for phrase in rule.get("exact", ()):
+                self._add_phrase(rank, tokenize(phrase), True, vocabulary)
+        self.vocabulary = vocabulary
+
+        self.trigram_index = defaultdict(list)
+        for word in vocabulary:
+            if max_distance(len(word) + 1):
+                for gram in trigrams(word):
+                    self.trigram_index[gram].append(word)
+        self.token_cache = {}
+
+    @classmethod
+    def merged(cls, matchers):
+        """One matcher over the rules of several, reusing their indexes.
+
+        Rules keep their order within each matcher, and every rule of an
+        earlier matcher ranks above those of later ones.
+        """
+        self = cls.__new__(cls)
+        self.rules = []
+        self.phrases = defaultdict(list)
+        self.vocabulary = set()
+        self.trigram_index = defaultdict(list)
+        for matcher in matchers:
+            offset = len(self.rules)
+            self.rules += matcher.rules
+            for word, entries in matcher.phrases.items():
+                self.phrases[word] += [(offset + rank, tokens, whole) for rank, tokens, whole in entries]
+            new_words = matcher.vocabulary - self.vocabulary
+            for gram, words in matcher.trigram_index.items():
+                self.trigram_index[gram] += [word for word in words if word in new_words]
+            self.vocabulary |= new_words
+        self.token_cache = {}
+        return self
+
+    def _add_phrase(self, rank, tokens, whole_message, vocabulary):
+        if not tokens:
+            return
+        self.phrases[tokens[0]].append((rank, tokens, whole_message))
+        vocabulary.update(tokens)
+
+    def token_matches(self, token):
+        """Return {vocabulary word: similarity} for one message token."""
+        cached = self.token_cache.get(token)
+        if cached is not None:
+            return cached
+
+        if token in self.vocabulary:
+            result = {token: 1.0}
+        else:
+            result = {}
+            if max_distance(len(token) + 1):
+                grams = trigrams(token)
+                shared = defaultdict(int)
+                for gram in grams:
+                    for word in self.trigram_index.get(gram, ()):
+                        shared[word] += 1
+                for word, count in shared.items():
+                    limit = max_distance(max(len(token), len(word)))
+                    # q-gram filter: one edit breaks at most 4 trigrams (a swap)
+                    if not limit or count < max(len(grams), len(word)) - 4 * limit:
+                        continue
+                    distance = bounded_distance(token, word, limit)
+                    if distance <= limit:
+                        result[word] = 1.0 - distance / max(len(token), len(word))
+
+        if len(self.token_cache) >= TOKEN_CACHE_SIZE:
+            self.token_cache.clear()
+        self.token_cache[token] = result
+        return result
+
+    def match(self, text):
+        rank, confidence = self.match_tokens(tokenize(text))
+        if rank is None:
+            return None, 0.0
+        return self.rules[rank], confidence
+
+    def match_tokens(self, tokens):
+        """Return (rank of the best rule in self.rules, confidence), or (None, 0.0)."""
+        if not tokens:
+            return None, 0.0
+        matches = [self.token_matches(token) for token in tokens]
+
+        best_rank = None
+        best_confidence = 0.0
+        for i, candidates in enumerate(matches):
+            for word, similarity in candidates.items():
+                for rank, phrase, whole_message in self.phrases.get(word, ()):
+                    if whole_message and (i != 0 or len(phrase) != len(tokens)):
+                        continue
+                    if i + len(phrase) > len(tokens):
+                        continue
+                    total = similarity
+                    for j in range(1, len(phrase)):
+                        sim = matches[i + j].get(phrase[j])
+                        if sim is None:
+                            break
+                        total += sim
+                    else:
+                        confidence = total / len(phrase)
+                        if confidence > best_confidence or (
+                            confidence == best_confidence and rank < best_rank
+                        ):
+                            best_rank = rank
+                            best_confidence = confidence
+        return best_rank, best_confidence
@@ -1,155 +1,250 @@
-import tkinter as tk
-from tkinter import scrolledtext
-from datetime import datetime
-
-def get_bot_response(user_input: str) -> str:
-    text = user_input.lower().strip()
-
-    if text in ["bye", "exit", "quit", "goodbye"]:
-        return "Goodbye! It was nice talking to you. 👋"
-
-    if any(word in text for word in ["hello", "hi", "hey", "good morning", "good afternoon", "good evening"]):
-        return "Hello! 😊 How can I help you today?"
-
-    if "how are you" in text:
-        return "I'm just a bunch of Python code, but I'm feeling awesome! 😄 What about you?"
-
-    if "your name" in text or "who are you" in text:
-        return "I'm a simple rule-based chatbot built using Python and Tkinter."
-
-    if "who created you" in text or "your creator" in text:
-        return "I was created by a Python programmer as a mini chatbot project."
-
-    if "time" in text:
-        now = datetime.now().strftime("%I:%M %p")
-        return f"The current time is {now}."
-
-    if "date" in text or "today's date" in text:
-        today = datetime.now().strftime("%d-%m-%Y")
-        return f"Today's date is {today}."
-
-    if "weather" in text:
-        return "I can't fetch live weather yet, but I hope it's a pleasant day where you are! ☀️"
-
-    if "thank you" in text or "thanks" in text:
-        return "You're welcome! 😊 Happy to help."
-
-    if "sorry" in text:
-        return "It's okay, no worries at all. 💙"
-
-    if "study" in text or "exam" in text or "exams" in text:
-        return (
-            "Stay consistent with your studies 📚. "
-            "Make a timetable, revise daily, and take short breaks. You've got this! 💪"
-        )
-
-    if "programming" in text or "coding" in text or "python" in text:
-        return (
-            "Programming is fun! 🧑‍💻 Start with basics like variables, loops, and functions. "
-            "Practice small projects like calculators, to-do apps, or chatbots like me!"
-        )
-
-    if "joke" in text:
-        return "Why do programmers prefer dark mode? Because light attracts bugs! 🐞😂"
-
-    if "help" in text:
-        return (
-            "Sure! I can chat about:\n"
-            "- My name / who I am 🤖\n"
-            "- Time and date ⏰📅\n"
-            "- Study & exams 📚\n"
-            "- Programming & coding 🧑‍💻\n"
-            "- Jokes 😂\n"
-            "Just type what you want to talk about!"
-        )
-
-    return (
-        "I'm not sure how to respond to that yet. 🤔\n"
-        "Try asking me about the time, date, studies, coding, or say 'help' to see options."
+"""Tkinter front end for the rule-based chatbot.
+
+tkinter is only imported, and the window only built, when main() runs, so
+this module can be imported without a display.
+"""
+
+from collections import deque
+
+from chat_history import ChatHistory
+from chatbot_engine import get_matcher, respond, use_rule_files
+
+# Tk index and state names, spelled out so tkinter isn't needed at import
+END = "end"
+NORMAL = "normal"
+DISABLED = "disabled"
+
+# Messages kept in the text widget; everything else is read back from the
+# on-disk history when the user scrolls to the top or bottom edge.
+MAX_VISIBLE_MESSAGES = 200
+HISTORY_PAGE = 50
+
+
+class VirtualChatArea:
+    """Shows a sliding window [first, last) of the chat history in a text widget.
+
+    New messages are logged to disk and queued; one idle callback inserts
+    the whole queue with a single state toggle. The widget never holds more
+    than MAX_VISIBLE_MESSAGES messages, so session length doesn't affect
+    insert, scroll or redraw cost.
+    """
+
+    def __init__(self, text, history):
+        self.text = text
+        self.history = history
+        self.first = 0
+        self.last = 0
+        self.heights = deque()  # line count of each displayed message
+        self.pending = []
+        self.flush_scheduled = False
+        self.loading = False
+        text.config(yscrollcommand=self.on_yscroll)
+
+    @property
+    def live(self):
+        return self.last + len(self.pending) == len(self.history)
+
+    def add(self, text, tag):
+        live = self.live
+        self.history.append(tag, text)
+        if not live:
+            return  # scrolled back in history; shown when the user returns
+        self.pending.append((text, tag))
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.text.after_idle(self.flush)
+
+    def flush(self):
+        self.flush_scheduled = False
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        self._insert(END, pending)
+        self.heights.extend(text.count("\n") for text, _ in pending)
+        self.last += len(pending)
+        self._trim_top(len(self.heights) - MAX_VISIBLE_MESSAGES)
+        self.text.config(state=DISABLED)
+        self.text.see(END)
+
+    def jump_to_live(self):
+        if self.live:
+            return
+        self.pending = []
+        self.text.config(state=NORMAL)
+        self.text.delete("1.0", END)
+        self.heights.clear()
+        self.last = len(self.history)
+        self.first = max(0, self.last - MAX_VISIBLE_MESSAGES)
+        messages = [(text, tag) for tag, text in self.history.read(self.first, self.last)]
+        self._insert(END, messages)
+        self.heights.extend(text.count("\n") for text, _ in messages)
+        self.text.config(state=DISABLED)
+        self.text.see(END)
+
+    def on_yscroll(self, top, bottom):
+        self.text.vbar.set(top, bottom)
+        if self.loading:
+            return
+        if float(top) <= 0.0 and self.first > 0:
+            self.loading = True
+            self.text.after_idle(self.load_older)
+        elif float(bottom) >= 1.0 and self.last < len(self.history) - len(self.pending):
+            self.loading = True
+            self.text.after_idle(self.load_newer)
+
+    def load_older(self):
+        self.loading = False
+        start = max(0, self.first - HISTORY_PAGE)
+        messages = [(text, tag) for tag, text in self.history.read(start, self.first)]
+        if not messages:
+            return
+        self._insert("1.0", messages)
+        added = [text.count("\n") for text, _ in messages]
+        self.heights.extendleft(reversed(added))
+        self.first = start
+        self._trim_bottom(len(self.heights) - MAX_VISIBLE_MESSAGES)
+        self.text.config(state=DISABLED)
+        # Keep the message that was at the top in view
+        self.text.yview(f"{sum(added) + 1}.0")
+
+    def load_newer(self):
+        self.loading = False
+        stop = min(len(self.history), self.last + HISTORY_PAGE)
+        messages = [(text, tag) for tag, text in self.history.read(self.last, stop)]
+        if not messages:
+            return
+        self._insert(END, messages)
+        self.heights.extend(text.count("\n") for text, _ in messages)
+        self.last = stop
+        self._trim_top(len(self.heights) - MAX_VISIBLE_MESSAGES)
+        self.text.config(state=DISABLED)
+
+    def _insert(self, index, messages):
+        # One insert call for the whole batch: (text, tag, text, tag, ...)
+        self.text.config(state=NORMAL)
+        if not messages:
+            return
+        args = []
+        for text, tag in messages:
+            args.extend((text, tag))
+        self.text.insert(index, *args)
+
+    def _trim_top(self, count):
+        if count <= 0:
+            return
+        lines = sum(self.heights.popleft() for _ in range(count))
+        self.text.delete("1.0", f"{lines + 1}.0")
+        self.first += count
+
+    def _trim_bottom(self, count):
+        if count <= 0:
+            return
+        for _ in range(count):
+            self.heights.pop()
+        self.text.delete(f"{sum(self.heights) + 1}.0", END)
+        self.last -= count
+
+
+def main(argv=None):
+    import argparse
+    import tkinter as tk
+    from tkinter import scrolledtext
+
+    parser = argparse.ArgumentParser(description="Rule-based chatbot")
+    parser.add_argument("--rules", nargs="+", metavar="FILE",
+                        help="JSON/YAML rule files to use instead of the built-in rules "
+                             "(reloaded when they change)")
+    args = parser.parse_args(argv)
+    if args.rules:
+        use_rule_files(args.rules)
+
+    def send_message(event=None):
+        user_msg = user_input.get().strip()
+        if not user_msg:
+            return
+
+        chat_view.jump_to_live()
+        chat_view.add(f"You: {user_msg}\n", "user")
+
+        intent, bot_msg, _ = respond(user_msg)
+        chat_view.add(f"Bot: {bot_msg}\n\n", "bot")
+
+        user_input.set("")
+
+        # Close on whatever the rules answered with goodbye, as chat_server.py does
+        if intent == "goodbye":
+            root.after(1200, root.destroy)
+
+    root = tk.Tk()
+    root.title("Rule-Based Chatbot")
+    root.geometry("650x500")
+    root.minsize(450, 350)
+
+    root.rowconfigure(1, weight=1)
+    root.columnconfigure(0, weight=1)
+
+    header = tk.Label(
+        root,
+        text="💬 Simple Rule-Based Chatbot",
+        font=("Segoe UI", 14, "bold"),
+        bg="#2c3e50",
+        fg="white",
+        pady=8
     )
+    header.grid(row=0, column=0, sticky="ew")
 
-def send_message(event=None):
-    user_msg = user_input.get().strip()
-    if not user_msg:
-        return
-
-    chat_area.config(state=tk.NORMAL)
-    chat_area.insert(tk.END, f"You: {user_msg}\n", "user")
-
-    bot_msg = get_bot_response(user_msg)
-    chat_area.insert(tk.END, f"Bot: {bot_msg}\n\n", "bot")
-    chat_area.config(state=tk.DISABLED)
-    chat_area.see(tk.END)
-
-    user_input.set("")
-
-    if user_msg.lower().strip() in ["bye", "exit", "quit", "goodbye"]:
-        root.after(1200, root.destroy)
-
-root = tk.Tk()
-root.title("Rule-Based Chatbot")
-root.geometry("650x500")
-root.minsize(450, 350)
-
-root.rowconfigure(1, weight=1)
-root.columnconfigure(0, weight=1)
-
-header = tk.Label(
-    root,
-    text="💬 Simple Rule-Based Chatbot",
-    font=("Segoe UI", 14, "bold"),
-    bg="#2c3e50",
-    fg="white",
-    pady=8
-)
-header.grid(row=0, column=0, sticky="ew")
-
-chat_area = scrolledtext.ScrolledText(
-    root,
-    wrap=tk.WORD,
-    state=tk.DISABLED,
-    font=("Segoe UI", 10)
-)
-chat_area.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
-
-chat_area.tag_config("user", foreground="#0b63ce", font=("Segoe UI", 10, "bold"))
-chat_area.tag_config("bot", foreground="#2c3e50", font=("Segoe UI", 10))
-chat_area.tag_config("system", foreground="#7f8c8d", font=("Segoe UI", 9, "italic"))
-
-input_frame = tk.Frame(root)
-input_frame.grid(row=2, column=0, padx=10, pady=10, sticky="ew")
-
-input_frame.columnconfigure(0, weight=1)
-input_frame.columnconfigure(1, weight=0)
-
-user_input = tk.StringVar()
-entry = tk.Entry(
-    input_frame,
-    textvariable=user_input,
-    font=("Segoe UI", 10)
-)
-entry.grid(row=0, column=0, sticky="ew", ipady=4)
-entry.bind("<Return>", send_message)
-
-send_button = tk.Button(
-    input_frame,
-    text="Send",
-    command=send_message,
-    font=("Segoe UI", 10, "bold"),
-    bg="#0b63ce",
-    fg="white",
-    padx=12,
-    pady=4
-)
-send_button.grid(row=0, column=1, padx=(5, 0))
-
-chat_area.config(state=tk.NORMAL)
-chat_area.insert(
-    tk.END,
-    "Bot: Hello! I am your GUI chatbot. Type 'help' to see what I can do, or 'bye' to quit.\n\n",
-    "bot"
-)
-chat_area.config(state=tk.DISABLED)
-
-entry.focus()
-root.mainloop()
+    chat_area = scrolledtext.ScrolledText(
+        root,
+        wrap=tk.WORD,
+        state=tk.DISABLED,
+        font=("Segoe UI", 10)
+    )
+    chat_area.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
+
+    chat_area.tag_config("user", foreground="#0b63ce", font=("Segoe UI", 10, "bold"))
+    chat_area.tag_config("bot", foreground="#2c3e50", font=("Segoe UI", 10))
+    chat_area.tag_config("system", foreground="#7f8c8d", font=("Segoe UI", 9, "italic"))
+
+    input_frame = tk.Frame(root)
+    input_frame.grid(row=2, column=0, padx=10, pady=10, sticky="ew")
+
+    input_frame.columnconfigure(0, weight=1)
+    input_frame.columnconfigure(1, weight=0)
+
+    user_input = tk.StringVar()
+    entry = tk.Entry(
+        input_frame,
+        textvariable=user_input,
+        font=("Segoe UI", 10)
+    )
+    entry.grid(row=0, column=0, sticky="ew", ipady=4)
+    entry.bind("<Return>", send_message)
+
+    send_button = tk.Button(
+        input_frame,
+        text="Send",
+        command=send_message,
+        font=("Segoe UI", 10, "bold"),
+        bg="#0b63ce",
+        fg="white",
+        padx=12,
+        pady=4
+    )
+    send_button.grid(row=0, column=1, padx=(5, 0))
+
+    chat_history = ChatHistory()
+    chat_view = VirtualChatArea(chat_area, chat_history)
+    chat_view.add(
+        "Bot: Hello! I am your GUI chatbot. Type 'help' to see what I can do, or 'bye' to quit.\n\n",
+        "bot"
+    )
+
+    entry.focus()
+    # Compile the intent matcher while the window is idle, not on first send
+    root.after_idle(get_matcher)
+    root.mainloop()
+    chat_history.close()
+
+
+if __name__ == "__main__":
+    main()
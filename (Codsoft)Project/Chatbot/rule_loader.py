@@ -0,0 +1,219 @@
+"""External, hot-reloadable rule files for the chatbot.
+
+A rules file is JSON (or YAML, if PyYAML is installed) holding either a
+list of rules, which forms one group named after the file, or named groups:
+
+    {"groups": {"smalltalk": [{"intent": "greeting", "keywords": ["hello"], "response": "Hi!"}],
+                "courses":   [...]}}
+
+Rules use the chatbot_engine.RULES format. Each group is compiled into its
+own FuzzyIntentMatcher, and the groups' indexes are merged into one, so a
+message is looked up once however many groups there are. It is answered by
+the most confident match over all groups, ties going to the earlier group
+(files in the order given, then groups in file order) and then to the
+group's own priority order.
+
+RuleStore polls the files' mtimes (from a background thread with watch(),
+or on demand with reload()). When a file changes it is re-read, groups
+whose rules are unchanged keep their compiled matcher, and the new
+GroupedMatcher replaces `store.matcher` in one assignment: messages already
+being matched finish against the old one. A file that fails to load is
+logged and the previous rules stay in service.
+
+    python rule_loader.py export rules.json     # start from the built-in rules
+    python rule_loader.py check rules.json
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+from fuzzy_matcher import FuzzyIntentMatcher, tokenize
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+logger = logging.getLogger("chatbot.rules")
+
+LOAD_ERRORS = (OSError, ValueError, RuntimeError) + ((yaml.YAMLError,) if yaml else ())
+
+
+def read_rule_file(path):
+    """Return [(group name, rules), ...] from one file, validating every rule."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise RuntimeError(f"{path}: PyYAML is required for YAML rule files")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+
+    if isinstance(data, list):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        groups = [(stem, data)]
+    elif isinstance(data, dict) and isinstance(data.get("groups"), dict):
+        groups = list(data["groups"].items())
+    else:
+        raise ValueError(f"{path}: expected a list of rules or a 'groups' mapping")
+
+    for name, rules in groups:
+        if not isinstance(rules, list):
+            raise ValueError(f"{path}: group {name!r} must be a list of rules")
+        for i, rule in enumerate(rules):
+            where = f"{path}: group {name!r}, rule {i}"
+            if not isinstance(rule, dict):
+                raise ValueError(f"{where}: expected a mapping")
+            if not isinstance(rule.get("intent"), str) or not isinstance(rule.get("response"), str):
+                raise ValueError(f"{where}: 'intent' and 'response' must be strings")
+            for field in ("keywords", "exact"):
+                phrases = rule.get(field, [])
+                if not isinstance(phrases, list) or not all(isinstance(p, str) for p in phrases):
+                    raise ValueError(f"{where}: {field!r} must be a list of strings")
+            if not rule.get("keywords") and not rule.get("exact"):
+                raise ValueError(f"{where}: needs 'keywords' or 'exact'")
+            priority = rule.get("priority", 0)
+            if isinstance(priority, bool) or not isinstance(priority, (int, float)):
+                raise ValueError(f"{where}: 'priority' must be a number")
+    return groups
+
+
+class CompiledGroup:
+    def __init__(self, key, rules):
+        self.key = key
+        self.rules = rules
+        self.matcher = FuzzyIntentMatcher(rules)
+
+
+class GroupedMatcher:
+    """Matches against several compiled groups; same interface as FuzzyIntentMatcher."""
+
+    def __init__(self, groups):
+        self.groups = groups
+        self.index = FuzzyIntentMatcher.merged([group.matcher for group in groups])
+        # rank in the merged index -> (group, rule)
+        self.entries = [(group, rule) for group in groups for rule in group.matcher.rules]
+
+    def match(self, text):
+        rank, confidence = self.index.match_tokens(tokenize(text))
+        if rank is None:
+            return None, 0.0
+        return self.entries[rank][1], confidence
+
+
+class RuleStore:
+    def __init__(self, paths):
+        if isinstance(paths, str):
+            paths = [paths]
+        self.paths = list(paths)
+        self.mtimes = {}
+        self.groups = {}     # (path, group name) -> CompiledGroup
+        self.matcher = None
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        # The first load raises, so a broken file is caught at startup
+        self.reload(force=True, raise_errors=True)
+
+    def _signature(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def reload(self, force=False, raise_errors=False):
+        """Re-read changed files; return True if the matcher was replaced."""
+        with self._lock:
+            signatures = {path: self._signature(path) for path in self.paths}
+            if not force and signatures == self.mtimes:
+                return False
+
+            start = time.perf_counter()
+            groups = {}
+            compiled = 0
+            try:
+                for path in self.paths:
+                    if not force and signatures[path] == self.mtimes.get(path):
+                        groups.update((key, group) for key, group in self.groups.items() if key[0] == path)
+                        continue
+                    for name, rules in read_rule_file(path):
+                        key = (path, name)
+                        old = self.groups.get(key)
+                        if old is not None and old.rules == rules:
+                            groups[key] = old
+                        else:
+                            groups[key] = CompiledGroup(key, rules)
+                            compiled += 1
+            except Exception as exc:
+                # Don't retry until the file changes again
+                self.mtimes = signatures
+                if raise_errors or not isinstance(exc, LOAD_ERRORS):
+                    raise
+                logger.error("rules not reloaded, keeping the previous set: %s", exc)
+                return False
+
+            order = {path: i for i, path in enumerate(self.paths)}
+            ordered = sorted(groups.values(), key=lambda group: order[group.key[0]])
+            self.groups = groups
+            self.mtimes = signatures
+            self.matcher = GroupedMatcher(ordered)
+            self.reloads += 1
+            logger.info("loaded %d rule groups (%d recompiled, %d rules) in %.1f ms",
+                        len(groups), compiled, sum(len(g.rules) for g in ordered),
+                        1000 * (time.perf_counter() - start))
+            return True
+
+    def watch(self, interval=1.0):
+        """Poll the rule files every `interval` seconds from a daemon thread."""
+        if self._thread is not None:
+            return
+
+        def poll():
+            while not self._stop.wait(interval):
+                try:
+                    self.reload()
+                except Exception:
+                    # Never let one bad reload end the watcher
+                    logger.exception("rule reload failed, keeping the previous set")
+
+        self._thread = threading.Thread(target=poll, name="rule-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export or validate chatbot rule files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="write the built-in rules as a JSON rules file")
+    export.add_argument("path")
+    check = sub.add_parser("check", help="load rule files and report what they contain")
+    check.add_argument("paths", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        from chatbot_engine import RULES
+        with open(args.path, "w", encoding="utf-8") as f:
+            json.dump({"groups": {"builtin": RULES}}, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        return
+
+    logging.basicConfig(level=logging.INFO, format="%(name)s: %(message)s")
+    store = RuleStore(args.paths)
+    for (path, name), group in store.groups.items():
+        print(f"{path}: {name}: {len(group.rules)} rules")
+
+
+if __name__ == "__main__":
+    main()
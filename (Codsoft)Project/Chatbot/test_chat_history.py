@@ -0,0 +1,157 @@
+import json
+import random
+
+import pytest
+
+import gui_chatbot
+from chat_history import ChatHistory
+from gui_chatbot import VirtualChatArea
+
+
+class FakeText:
+    """Just enough of a Tk Text widget: content as one string, idle queue."""
+
+    def __init__(self):
+        self.content = ""
+        self.idle = []
+        self.vbar = self
+
+    def set(self, top, bottom):
+        pass
+
+    def config(self, **options):
+        pass
+
+    def see(self, index):
+        pass
+
+    def yview(self, *args):
+        pass
+
+    def after_idle(self, callback):
+        self.idle.append(callback)
+
+    def run_idle(self):
+        while self.idle:
+            self.idle.pop(0)()
+
+    def _offset(self, index):
+        if index == "end":
+            return len(self.content)
+        line = int(index.split(".")[0])
+        return sum(len(text) + 1 for text in self.content.split("\n")[:line - 1])
+
+    def insert(self, index, *args):
+        offset = self._offset(index)
+        self.content = self.content[:offset] + "".join(args[0::2]) + self.content[offset:]
+
+    def delete(self, start, stop):
+        a, b = self._offset(start), min(self._offset(stop), len(self.content))
+        self.content = self.content[:a] + self.content[b:]
+
+
+def message(i):
+    return f"You: message {i}\n" + "more\n" * (i % 3)
+
+
+@pytest.fixture
+def history():
+    h = ChatHistory()
+    yield h
+    h.close()
+
+
+def test_append_returns_indices_and_read_slices(history):
+    for i in range(10):
+        assert history.append("user" if i % 2 else "bot", message(i)) == i
+    assert len(history) == 10
+    assert history.read(3, 6) == [("bot" if i % 2 == 0 else "user", message(i)) for i in range(3, 6)]
+    assert history.read(-5, 2) == history.read(0, 2)
+    assert history.read(8, 100) == history.read(8, 10)
+    assert history.read(6, 6) == []
+
+
+def test_messages_spill_to_a_jsonl_file(tmp_path):
+    path = tmp_path / "chat.jsonl"
+    history = ChatHistory(str(path))
+    history.append("user", "You: héllo\n")
+    history.append("bot", "Bot: two\nlines\n\n")
+    history.file.flush()
+    lines = path.read_bytes().splitlines()
+    assert [json.loads(line) for line in lines] == [["user", "You: héllo\n"], ["bot", "Bot: two\nlines\n\n"]]
+    assert history.offsets.tolist() == [0, len(lines[0]) + 1]
+    history.close()
+
+
+def test_messages_outside_the_window_are_read_back(history):
+    text = FakeText()
+    view = VirtualChatArea(text, history)
+    total = gui_chatbot.MAX_VISIBLE_MESSAGES + 150
+    for i in range(total):
+        view.add(message(i), "user")
+    text.run_idle()
+
+    assert (view.first, view.last) == (150, total)
+    assert text.content == "".join(message(i) for i in range(150, total))
+    # The scrolled-out messages still come back from disk
+    assert history.read(0, 150) == [("user", message(i)) for i in range(150)]
+
+
+def assert_window_matches_history(view, text):
+    assert text.content == "".join(msg for _, msg in view.history.read(view.first, view.last))
+    assert len(view.heights) == view.last - view.first <= gui_chatbot.MAX_VISIBLE_MESSAGES
+
+
+def test_window_slides_with_scrolling(history, monkeypatch):
+    monkeypatch.setattr(gui_chatbot, "MAX_VISIBLE_MESSAGES", 20)
+    monkeypatch.setattr(gui_chatbot, "HISTORY_PAGE", 7)
+    text = FakeText()
+    view = VirtualChatArea(text, history)
+    for i in range(60):
+        view.add(message(i), "user")
+    text.run_idle()
+    assert (view.first, view.last) == (40, 60)
+
+    # Scrolling to the top pages older messages in and drops the newest
+    view.on_yscroll("0.0", "0.3")
+    text.run_idle()
+    assert (view.first, view.last) == (33, 53)
+    assert_window_matches_history(view, text)
+
+    # Messages arriving while scrolled back are only logged
+    view.add(message(60), "user")
+    text.run_idle()
+    assert view.last == 53 and len(history) == 61
+
+    view.on_yscroll("0.7", "1.0")
+    text.run_idle()
+    assert (view.first, view.last) == (40, 60)
+    assert_window_matches_history(view, text)
+
+    view.jump_to_live()
+    assert (view.first, view.last) == (41, 61)
+    assert_window_matches_history(view, text)
+
+
+def test_window_stays_consistent_under_random_use(history, monkeypatch):
+    monkeypatch.setattr(gui_chatbot, "MAX_VISIBLE_MESSAGES", 20)
+    monkeypatch.setattr(gui_chatbot, "HISTORY_PAGE", 7)
+    text = FakeText()
+    view = VirtualChatArea(text, history)
+    rng = random.Random(0)
+    for step in range(2000):
+        op = rng.random()
+        if op < 0.5:
+            if rng.random() < 0.3:
+                view.jump_to_live()
+            view.add(message(step), "user")
+            if rng.random() < 0.5:
+                continue  # leave the flush queued
+        elif op < 0.75:
+            text.run_idle()
+            view.on_yscroll("0.0", "0.5")
+        else:
+            text.run_idle()
+            view.on_yscroll("0.5", "1.0")
+        text.run_idle()
+        assert_window_matches_history(view, text)
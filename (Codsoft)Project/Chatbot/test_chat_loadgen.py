@@ -0,0 +1,56 @@
+import asyncio
+import random
+import socket
+
+from chat_loadgen import run_session
+from chat_server import ChatServer
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def session(port, requests=3):
+    latencies, errors = [], []
+
+    def open_connection():
+        return asyncio.open_connection("127.0.0.1", port)
+
+    asyncio.run(run_session(open_connection, requests, latencies, errors, random.Random(0)))
+    return latencies, errors
+
+
+def serving(server, requests=3):
+    async def run():
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        latencies, errors = [], []
+
+        def open_connection():
+            return asyncio.open_connection("127.0.0.1", port)
+
+        async with listener:
+            await run_session(open_connection, requests, latencies, errors, random.Random(0))
+        return latencies, errors
+
+    return asyncio.run(run())
+
+
+def test_refused_connection_is_an_error_not_a_crash():
+    latencies, errors = session(free_port())
+    assert latencies == []
+    assert len(errors) == 1
+
+
+def test_error_replies_record_no_latency():
+    latencies, errors = serving(ChatServer(max_connections=0))
+    assert latencies == []
+    assert errors == ["server busy, try again later"]
+
+
+def test_every_successful_reply_records_a_latency():
+    latencies, errors = serving(ChatServer(), requests=5)
+    assert errors == []
+    assert len(latencies) == 5
@@ -0,0 +1,37 @@
+import json
+import re
+
+import pytest
+
+import chatbot_engine
+from chatbot_engine import render_response, respond
+
+
+@pytest.fixture
+def rule_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(chatbot_engine, "_rule_store", None)
+
+    def use(rules):
+        path = str(tmp_path / "rules.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rules, f)
+        return chatbot_engine.use_rule_files(path, poll_interval=None)
+
+    return use
+
+
+def test_placeholders_are_filled_in():
+    assert re.fullmatch(r"It is \d\d:\d\d [AP]M on \d\d-\d\d-\d{4}\.", render_response("It is {time} on {date}."))
+
+
+@pytest.mark.parametrize("template", ["use {braces}", "{", "}{", "{0}", "{time", "a {{b}} c"])
+def test_other_braces_are_left_alone(template):
+    assert render_response(template) == template
+
+
+def test_braces_in_rule_file_responses(rule_file):
+    rule_file([{"intent": "json", "keywords": ["json"], "response": 'Write {"key": 1} at {time}'}])
+    intent, response, _ = respond("show me json")
+    assert intent == "json"
+    assert response.startswith('Write {"key": 1} at ')
+    assert "{time}" not in response
@@ -0,0 +1,69 @@
+import pytest
+
+from chatbot_engine import CONFIDENCE_THRESHOLD, RULES
+from fuzzy_matcher import FuzzyIntentMatcher, bounded_distance
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return FuzzyIntentMatcher(RULES)
+
+
+def intent(matcher, text):
+    rule, confidence = matcher.match(text)
+    if rule is None or confidence < CONFIDENCE_THRESHOLD:
+        return None
+    return rule["intent"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("hello", "greeting"),
+    ("hey there", "greeting"),
+    ("good morning!", "greeting"),
+    ("what's the date today", "date"),
+    ("what time is it", "time"),
+    ("tell me a joke", "joke"),
+    ("help me", "help"),
+    ("bye", "goodbye"),
+    ("how are you", "how_are_you"),
+    # typos in longer words
+    ("helo", "greeting"),
+    ("thnaks a lot", "thanks"),
+    ("how is the wether", "weather"),
+    ("I like progamming", "programming"),
+    ("any tips for my exmas", "study"),
+    ("who is your creater", "creator"),
+])
+def test_true_positives(matcher, text, expected):
+    assert intent(matcher, text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    # keywords inside other words
+    "this is it",
+    "they were shiny",
+    "nothing here",
+    # one edit away from a short keyword
+    "I have some data",
+    "that is late",
+    "see you later mate",
+    "He held it",
+    "the gate is open",
+    "what a hit",
+    # exact-only phrases inside a longer message
+    "I want to quit smoking",
+])
+def test_false_positives(matcher, text):
+    assert intent(matcher, text) is None
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("time", "time", 0),
+    ("tiem", "time", 1),
+    ("helo", "hello", 1),
+    ("thnaks", "thanks", 1),
+    ("date", "data", 1),
+    ("abc", "xyz", 3),
+])
+def test_bounded_distance(a, b, distance):
+    assert bounded_distance(a, b, 3) == distance
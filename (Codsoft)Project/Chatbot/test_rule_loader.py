@@ -0,0 +1,161 @@
+import itertools
+import json
+import os
+import time
+
+import pytest
+
+import rule_loader
+from fuzzy_matcher import FuzzyIntentMatcher
+from rule_loader import RuleStore, read_rule_file
+
+_stamps = itertools.count(1)
+
+GOOD = [{"intent": "greeting", "keywords": ["hello"], "response": "Hi!"}]
+
+
+def write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(data if isinstance(data, str) else json.dumps(data))
+    # Distinct mtimes even on filesystems with coarse timestamps
+    stamp = time.time_ns() + next(_stamps) * 10**9
+    os.utime(path, ns=(stamp, stamp))
+
+
+def answer(store, text):
+    rule, _ = store.matcher.match(text)
+    return rule["response"] if rule else None
+
+
+@pytest.mark.parametrize("rule", [
+    {"intent": "x", "keywords": [5], "response": "r"},
+    {"intent": "x", "keywords": "hello", "response": "r"},
+    {"intent": "x", "exact": [None], "response": "r"},
+    {"intent": "x", "keywords": ["hello"], "response": "r", "priority": "high"},
+    {"intent": "x", "keywords": ["hello"], "response": "r", "priority": True},
+    {"intent": "x", "keywords": ["hello"]},
+    {"intent": "x", "response": "r"},
+])
+def test_malformed_rules_are_rejected(tmp_path, rule):
+    path = str(tmp_path / "rules.json")
+    write(path, [rule])
+    with pytest.raises(ValueError):
+        read_rule_file(path)
+
+
+@pytest.mark.parametrize("broken", [
+    "{not json",
+    [{"intent": "greeting", "keywords": [5], "response": "Broken"}],
+    [{"intent": "greeting", "keywords": "hello", "response": "Broken"}],
+])
+def test_bad_reload_keeps_previous_rules(tmp_path, broken):
+    path = str(tmp_path / "rules.json")
+    write(path, GOOD)
+    store = RuleStore(path)
+
+    write(path, broken)
+    assert store.reload() is False
+    assert answer(store, "hello there") == "Hi!"
+
+    write(path, [{"intent": "greeting", "keywords": ["hello"], "response": "Fixed"}])
+    assert store.reload() is True
+    assert answer(store, "hello there") == "Fixed"
+
+
+def test_watcher_survives_unexpected_errors(tmp_path, monkeypatch):
+    path = str(tmp_path / "rules.json")
+    write(path, GOOD)
+    store = RuleStore(path)
+
+    real_read = rule_loader.read_rule_file
+    calls = []
+
+    def flaky_read(p):
+        calls.append(p)
+        if len(calls) == 1:
+            raise AttributeError("unexpected")
+        return real_read(p)
+
+    monkeypatch.setattr(rule_loader, "read_rule_file", flaky_read)
+    store.watch(interval=0.01)
+    try:
+        write(path, [{"intent": "greeting", "keywords": ["hello"], "response": "Second"}])
+        deadline = time.monotonic() + 2
+        while not calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert store._thread.is_alive()
+        assert answer(store, "hello") == "Hi!"
+
+        write(path, [{"intent": "greeting", "keywords": ["hello"], "response": "Third"}])
+        while answer(store, "hello") != "Third" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert answer(store, "hello") == "Third"
+    finally:
+        store.stop()
+
+
+def test_broken_file_fails_at_startup(tmp_path):
+    path = str(tmp_path / "rules.json")
+    write(path, [{"intent": "x", "keywords": [1], "response": "r"}])
+    with pytest.raises(ValueError):
+        RuleStore(path)
+
+
+def per_group_match(groups, text):
+    """The reference answer: the best match of each group, earlier groups winning ties."""
+    best_rule, best_confidence = None, 0.0
+    for group in groups:
+        rule, confidence = group.matcher.match(text)
+        if rule is not None and confidence > best_confidence:
+            best_rule, best_confidence = rule, confidence
+    return best_rule, best_confidence
+
+
+GROUPS = {
+    "smalltalk": [
+        {"intent": "greeting", "keywords": ["hello", "hi"], "response": "Hi from smalltalk"},
+        {"intent": "weather", "keywords": ["weather", "rain"], "response": "Sunny", "priority": 5},
+        {"intent": "goodbye", "exact": ["bye"], "response": "Bye!"},
+    ],
+    "courses": [
+        {"intent": "greeting", "keywords": ["hello"], "response": "Hi from courses"},
+        {"intent": "exams", "keywords": ["exam schedule", "exams"], "response": "In May"},
+        {"intent": "python", "keywords": ["python course", "programming"], "response": "Python 101",
+         "priority": -1},
+    ],
+    "campus": [
+        {"intent": "library", "keywords": ["library hours", "library"], "response": "9 to 5"},
+        {"intent": "rain", "keywords": ["rain"], "response": "Bring an umbrella"},
+    ],
+}
+
+
+@pytest.mark.parametrize("text", [
+    "hello", "helo there", "hi", "is it going to rain", "what's the weather", "wether",
+    "bye", "bye now", "when is the exam schedule", "exmas", "any python course?",
+    "I like programming in the library", "library hours please", "librery", "nothing matches",
+    "",
+])
+def test_merged_index_matches_per_group_matching(tmp_path, text):
+    path = str(tmp_path / "rules.json")
+    write(path, {"groups": GROUPS})
+    store = RuleStore(path)
+    assert store.matcher.match(text) == per_group_match(store.matcher.groups, text)
+
+
+def test_one_lookup_per_message(tmp_path, monkeypatch):
+    paths = []
+    for i in range(20):
+        path = str(tmp_path / f"rules{i}.json")
+        write(path, [{"intent": f"topic{i}", "keywords": [f"topic{i}", "shared"], "response": str(i)}])
+        paths.append(path)
+    store = RuleStore(paths)
+
+    calls = []
+    real = FuzzyIntentMatcher.match_tokens
+    monkeypatch.setattr(FuzzyIntentMatcher, "match_tokens",
+                        lambda self, tokens: calls.append(self) or real(self, tokens))
+    assert answer(store, "tell me about topic7") == "7"
+    # Earlier files win ties
+    assert answer(store, "shared") == "0"
+    assert len(calls) == 2
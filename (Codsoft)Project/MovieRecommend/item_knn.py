@@ -0,0 +1,159 @@
+"""Item-based collaborative filtering with precomputed neighbor lists.
+
+Offline, build_item_neighbors() computes the cosine (or adjusted cosine:
+ratings centred on each user's mean) similarity between every pair of
+items, a block of items at a time, and keeps only the K most similar
+positive neighbors of each item. The index is two small (items x K) arrays,
+int32 neighbor columns and float32 similarities, padded with -1 / 0.
+
+Online, a user's ratings only touch the neighbor lists of the items they
+rated: an item's predicted rating is the similarity-weighted mean of the
+user's ratings of the rated items that list it as a neighbor.
+
+    python item_knn.py build --data ml-latest-small -o ml-neighbors.npz -k 50
+    python item_knn.py build --store ml-25m.store -o ml-25m-neighbors.npz
+"""
+
+import numpy as np
+import scipy.sparse as sp
+
+from rating_matrix import RatingMatrix
+from topk import top_k_indices
+
+# Size of the dense similarity block computed at once during a build
+BLOCK_BYTES = 64 * 2**20
+
+
+class ItemNeighbors:
+    def __init__(self, item_ids, neighbors, sims, adjusted=True):
+        self.item_ids = np.asarray(item_ids)
+        self.neighbors = neighbors    # int32 (items x K), column numbers, -1 = none
+        self.sims = sims              # float32 (items x K), best first, 0 for padding
+        self.adjusted = adjusted
+
+    @property
+    def k(self):
+        return self.neighbors.shape[1]
+
+    def item_index(self, item_ids):
+        return RatingMatrix._lookup(self.item_ids, item_ids)
+
+    def similar_items(self, item_id, n=10):
+        """[(item ID, similarity), ...] for one item."""
+        col = self.item_index([item_id])[0]
+        if col < 0:
+            return []
+        return [
+            (self.item_ids[j].item(), float(s))
+            for j, s in zip(self.neighbors[col][:n], self.sims[col][:n]) if j >= 0
+        ]
+
+    def predict(self, user_ratings):
+        """Predicted ratings for items near the rated ones, as (columns, predictions)."""
+        if not user_ratings:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        cols = self.item_index(list(user_ratings.keys()))
+        vals = np.asarray(list(user_ratings.values()), dtype=np.float32)
+        known = cols >= 0
+        cols, vals = cols[known], vals[known]
+
+        nbrs = self.neighbors[cols]
+        sims = self.sims[cols]
+        valid = nbrs >= 0
+        targets = nbrs[valid]
+        weights = sims[valid]
+        ratings = np.broadcast_to(vals[:, None], nbrs.shape)[valid]
+        n = len(self.item_ids)
+        totals = np.bincount(targets, weights=weights * ratings, minlength=n)
+        sim_sums = np.bincount(targets, weights=weights, minlength=n)
+        sim_sums[cols] = 0.0    # never recommend what the user already rated
+        candidates = np.flatnonzero(sim_sums > 0)
+        return candidates, (totals[candidates] / sim_sums[candidates]).astype(np.float32)
+
+    def recommend(self, user_ratings, top_n=5):
+        """Return [(item ID, predicted rating), ...], best first (all of them if top_n is None)."""
+        candidates, preds = self.predict(user_ratings)
+        order = top_k_indices(preds, top_n)
+        return [(self.item_ids[candidates[i]].item(), float(preds[i])) for i in order]
+
+    # ---- persistence ----
+
+    def save(self, path):
+        np.savez(path, item_ids=self.item_ids, neighbors=self.neighbors, sims=self.sims,
+                 adjusted=np.array([self.adjusted]))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls(f["item_ids"], f["neighbors"], f["sims"], bool(f["adjusted"][0]))
+
+
+def build_item_neighbors(matrix, k=50, adjusted=True, block_bytes=BLOCK_BYTES):
+    """Compute the top-k positive cosine neighbors of every item of a RatingMatrix."""
+    n_users, n_items = matrix.shape
+    x = sp.csr_matrix(matrix.csr, dtype=np.float32, copy=True)
+    if adjusted:
+        counts = np.diff(x.indptr)
+        sums = np.asarray(x.sum(axis=1)).ravel()
+        means = np.divide(sums, counts, out=np.zeros(n_users, dtype=np.float64), where=counts > 0)
+        x.data -= np.repeat(means, counts).astype(np.float32)
+
+    # Unit-length item columns, so a dot product is the cosine
+    norms = np.sqrt(np.asarray(x.multiply(x).sum(axis=0)).ravel())
+    inv = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    x = (x @ sp.diags(inv.astype(np.float32))).tocsc()
+    xt = x.T.tocsr()    # items x users
+
+    k = max(1, min(k, n_items - 1))
+    neighbors = np.full((n_items, k), -1, dtype=np.int32)
+    sims = np.zeros((n_items, k), dtype=np.float32)
+    block = max(1, block_bytes // (4 * max(n_items, 1)))
+    for start in range(0, n_items, block):
+        stop = min(n_items, start + block)
+        s = (xt[start:stop] @ x).toarray()
+        rows = np.arange(stop - start)
+        s[rows, np.arange(start, stop)] = -np.inf   # an item isn't its own neighbor
+        top = np.argpartition(-s, k - 1, axis=1)[:, :k]
+        vals = np.take_along_axis(s, top, axis=1)
+        order = np.argsort(-vals, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        vals = np.take_along_axis(vals, order, axis=1)
+        keep = vals > 0
+        neighbors[start:stop] = np.where(keep, top, -1)
+        sims[start:stop] = np.where(keep, vals, 0.0)
+    return ItemNeighbors(matrix.item_ids, neighbors, sims, adjusted)
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build an item-item neighbor index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    source = build.add_mutually_exclusive_group(required=True)
+    source.add_argument("--data", metavar="DIR", help="MovieLens-format directory")
+    source.add_argument("--store", metavar="DIR", help="rating store built by rating_store.py")
+    build.add_argument("-o", "--output", required=True, help="output .npz file")
+    build.add_argument("-k", type=int, default=50, help="neighbors kept per item")
+    build.add_argument("--plain-cosine", action="store_true",
+                       help="don't centre ratings on each user's mean")
+    args = parser.parse_args(argv)
+
+    if args.store:
+        from rating_store import open_store
+        matrix = open_store(args.store).matrix
+    else:
+        import movielens
+        matrix = movielens.load(args.data).to_rating_matrix()
+
+    start = time.perf_counter()
+    index = build_item_neighbors(matrix, k=args.k, adjusted=not args.plain_cosine)
+    index.save(args.output)
+    filled = (index.neighbors >= 0).mean()
+    print(f"{len(index.item_ids):,} items x {index.k} neighbors ({100 * filled:.0f}% filled) "
+          f"built in {time.perf_counter() - start:.1f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
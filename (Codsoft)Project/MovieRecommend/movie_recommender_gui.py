@@ -1,6 +1,16 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import math
+import queue
+import threading
+from functools import partial
+
+from ann_index import build_lsh_index
+from genre_index import GenreIndex
+from item_knn import build_item_neighbors
+from matrix_factorization import train_als
+from movielens import MovieList, MoviesById
+from rating_matrix import RatingMatrix
+from topk import top_k_indices
 
 # ====== Sample movie database ======
 movies = [
@@ -17,6 +27,13 @@ movies = [
 ]
 
 title_to_movie = {m["title"]: m for m in movies}
+movie_by_id = {m["id"]: m for m in movies}
+
+# Genre bitmasks + inverted index over `movies`, for content-based scoring
+genre_index = GenreIndex.from_movies(movies)
+
+# Movies offered for rating in the Collaborative Filtering tab
+rating_movies = movies
 
 # ====== Collaborative filtering: sample user rating data ======
 # Ratings out of 5
@@ -36,74 +53,137 @@ sample_ratings = {
     },
 }
 
-
-# ====== Content-based recommendation logic ======
-def score_movie_content(movie, liked_genres):
-    movie_genres = set(movie["genres"])
-    return len(movie_genres.intersection(liked_genres))
+# Sparse users x movies matrix, indexed by movie id
+rating_matrix = RatingMatrix.from_dict({
+    user: {title_to_movie[title]["id"]: r for title, r in ratings.items()}
+    for user, ratings in sample_ratings.items()
+})
+
+# Item-item neighbor index for item-based recommendations; built in the
+# background on first use unless loaded from a file made by item_knn.py
+item_neighbors = None
+
+
+def get_item_neighbors():
+    global item_neighbors
+    if item_neighbors is None:
+        item_neighbors = build_item_neighbors(rating_matrix)
+    return item_neighbors
+
+
+# Latent-factor model for matrix factorization recommendations; trained in
+# the background on first use unless loaded from a file made by
+# matrix_factorization.py
+mf_model = None
+
+
+def get_mf_model():
+    global mf_model
+    if mf_model is None:
+        mf_model = train_als(rating_matrix)
+    return mf_model
+
+
+# LSH index over the model's user factors, for finding similar users
+# without scanning every user. The index defaults find about 90% of the
+# true 50 nearest users (see ann_index.py); the rest are near misses.
+user_index = None
+ANN_NEIGHBORS = 50
+
+
+def get_user_index():
+    global user_index
+    if user_index is None:
+        user_index = build_lsh_index(get_mf_model().user_factors)
+    return user_index
+
+
+def model_ready(method):
+    """Whether `method` can answer without building anything first."""
+    if method == "item":
+        return item_neighbors is not None
+    if method == "mf":
+        return mf_model is not None
+    if method == "ann":
+        return user_index is not None
+    return True
+
+
+def build_model(method):
+    """Build what `method` needs; slow, so the GUI calls it off the Tk thread."""
+    if method == "item":
+        get_item_neighbors()
+    elif method == "mf":
+        get_mf_model()
+    elif method == "ann":
+        get_user_index()
+
+
+def use_dataset(data, matrix=None, index=None, rating_choices=20):
+    """Replace the sample data with a loaded MovieLens dataset (see movielens.py).
+
+    `matrix` / `index`: an already built RatingMatrix and GenreIndex, e.g.
+    from a memory-mapped store. Movies are only decoded when they are
+    shown, so with a store this takes the same time for any catalog size.
+    """
+    global movies, title_to_movie, movie_by_id, genre_index, rating_movies, rating_matrix
+    global item_neighbors, mf_model, user_index
+    movies = MovieList(data)
+    movie_by_id = MoviesById(data)
+    genre_index = GenreIndex.from_catalog(data) if index is None else index
+    rating_matrix = data.to_rating_matrix() if matrix is None else matrix
+    item_neighbors = None
+    mf_model = None
+    user_index = None
+    # Offer the most-rated movies for rating; the full catalog is too long a list
+    counts = rating_matrix.rating_counts()
+    popular = rating_matrix.item_ids[top_k_indices(counts, 2 * rating_choices)]
+    rating_movies = [movie_by_id[i] for i in popular.tolist() if i in movie_by_id][:rating_choices]
+    # Ratings are only ever entered for these movies
+    title_to_movie = {m["title"]: m for m in rating_movies}
 
 
+# ====== Content-based recommendation logic ======
 def recommend_movies_content(liked_genres, top_n=5):
-    scored = []
-    for movie in movies:
-        s = score_movie_content(movie, liked_genres)
-        if s > 0:
-            scored.append((movie, s))
-    scored.sort(key=lambda x: x[1], reverse=True)
-    return scored[:top_n]
+    """Movies sharing the most genres with `liked_genres`, as [(movie, score), ...]."""
+    return [(movies[row], score) for row, score in genre_index.recommend(liked_genres, top_n)]
 
 
 # ====== Collaborative filtering logic (user-based) ======
-def cosine_similarity(r1, r2):
-    """Compute cosine similarity between two rating dicts keyed by movie title."""
-    common = set(r1.keys()).intersection(r2.keys())
-    if not common:
-        return 0.0
-    num = sum(r1[m] * r2[m] for m in common)
-    sum1 = math.sqrt(sum(r1[m] ** 2 for m in common))
-    sum2 = math.sqrt(sum(r2[m] ** 2 for m in common))
-    if sum1 == 0 or sum2 == 0:
-        return 0.0
-    return num / (sum1 * sum2)
-
-
-def recommend_movies_collab(user_ratings, top_n=5):
-    """Simple user-based collaborative filtering."""
-    # Compute similarity of current user to every sample user
-    sims = {}
-    for uname, ur in sample_ratings.items():
-        sim = cosine_similarity(user_ratings, ur)
-        if sim > 0:
-            sims[uname] = sim
-
-    if not sims:
-        return []
-
-    # Predict rating for each movie user hasn't rated
-    totals = {}
-    sim_sums = {}
-
-    for uname, sim in sims.items():
-        for movie_title, rating in sample_ratings[uname].items():
-            if movie_title in user_ratings:
-                continue  # skip if already rated by user
-            totals.setdefault(movie_title, 0.0)
-            sim_sums.setdefault(movie_title, 0.0)
-            totals[movie_title] += sim * rating
-            sim_sums[movie_title] += sim
-
-    predictions = []
-    for movie_title in totals:
-        if sim_sums[movie_title] > 0:
-            pred_rating = totals[movie_title] / sim_sums[movie_title]
-            if movie_title in title_to_movie:
-                predictions.append((title_to_movie[movie_title], pred_rating))
-
-    predictions.sort(key=lambda x: x[1], reverse=True)
-    return predictions[:top_n]
+def recommend_movies_collab(user_ratings, top_n=5, method="user"):
+    """Collaborative filtering: "user"-based over the sparse rating matrix,
+    "item"-based over precomputed item neighbors, "mf" (matrix factorization),
+    or "ann": user-based over the nearest users in latent-factor space."""
+    by_id = {title_to_movie[t]["id"]: r for t, r in user_ratings.items() if t in title_to_movie}
+    if method == "item":
+        ranked = partial(get_item_neighbors().recommend, by_id)
+    elif method == "mf":
+        ranked = partial(get_mf_model().recommend, by_id)
+    elif method == "ann":
+        cols, vals = rating_matrix.query_vector(by_id)
+        if not len(cols):
+            return []
+        rows, sims = get_user_index().query(get_mf_model().fold_in(cols, vals), k=ANN_NEIGHBORS)
+        ranked = partial(rating_matrix.recommend_from_users, rows, sims, cols)
+    else:
+        ranked = partial(rating_matrix.recommend_user_based, by_id)
+
+    # Only the top_n best are selected; if some of them aren't in the movie
+    # catalog, fall back to ranking every candidate and skipping those
+    best = ranked(top_n=top_n)
+    results = [(movie_by_id[i], pred) for i, pred in best if i in movie_by_id]
+    if len(results) < len(best):
+        results = [(movie_by_id[i], pred) for i, pred in ranked(top_n=None) if i in movie_by_id][:top_n]
+    return results
 
 
 # ====== GUI Application ======
+MODEL_POLL_MS = 100
+
+COLLAB_METHODS = {"User-based": "user", "Item-based": "item", "Matrix factorization": "mf",
+                  "Approximate user neighbors": "ann"}
+
+
 class MovieRecommenderGUI:
     def __init__(self, root):
         self.root = root
@@ -180,10 +260,7 @@ class MovieRecommenderGUI:
         ).pack(anchor="w")
 
         # Genres
-        all_genres = set()
-        for m in movies:
-            all_genres.update(m["genres"])
-        self.cb_genres = sorted(list(all_genres))
+        self.cb_genres = sorted(genre_index.genre_names)
         self.cb_genre_vars = {}
 
         genre_frame = tk.Frame(left, bg="#0b1020")
@@ -359,7 +436,7 @@ class MovieRecommenderGUI:
 
         tk.Label(
             top,
-            text="Collaborative Filtering (User-Based)",
+            text="Collaborative Filtering",
             bg="#0b1020",
             fg="#a5b4fc",
             font=("Segoe UI", 12, "bold")
@@ -390,7 +467,7 @@ class MovieRecommenderGUI:
         ).grid(row=0, column=0, columnspan=2, sticky="w", pady=(0, 5))
 
         self.rating_vars = {}
-        for idx, m in enumerate(movies, start=1):
+        for idx, m in enumerate(rating_movies, start=1):
             tk.Label(
                 rate_frame,
                 text=m["title"],
@@ -435,7 +512,24 @@ class MovieRecommenderGUI:
         self.collab_top_n.set("5")
         self.collab_top_n.pack(side="left")
 
-        tk.Button(
+        tk.Label(
+            ctrl,
+            text="Method:",
+            bg="#0b1020",
+            fg="#e5e7eb",
+            font=("Segoe UI", 9)
+        ).pack(side="left", padx=(10, 5))
+
+        self.collab_method = ttk.Combobox(
+            ctrl,
+            values=list(COLLAB_METHODS),
+            state="readonly",
+            width=26
+        )
+        self.collab_method.set("User-based")
+        self.collab_method.pack(side="left")
+
+        self.collab_button = tk.Button(
             ctrl,
             text="Recommend from Ratings",
             bg="#10b981",
@@ -444,7 +538,21 @@ class MovieRecommenderGUI:
             relief="flat",
             padx=8, pady=3,
             command=self.collab_get_recommendations
-        ).pack(side="right", padx=(5, 0))
+        )
+        self.collab_button.pack(side="right", padx=(5, 0))
+
+        self.collab_status = tk.Label(
+            ctrl,
+            text="",
+            bg="#0b1020",
+            fg="#fbbf24",
+            font=("Segoe UI", 9)
+        )
+        self.collab_status.pack(side="right", padx=(5, 0))
+
+        # Models are built in a worker thread; it reports back through this
+        # queue, which poll_model_build() checks on the Tk thread.
+        self.model_build = None
 
         # Table
         columns = ("title", "genres", "pred")
@@ -480,7 +588,11 @@ class MovieRecommenderGUI:
         except ValueError:
             top_n = 5
 
-        results = recommend_movies_collab(user_ratings, top_n=top_n)
+        method = COLLAB_METHODS.get(self.collab_method.get(), "user")
+        if not model_ready(method):
+            self.start_model_build(method)
+            return
+        results = recommend_movies_collab(user_ratings, top_n=top_n, method=method)
 
         for item in self.collab_table.get_children():
             self.collab_table.delete(item)
@@ -500,9 +612,79 @@ class MovieRecommenderGUI:
                 )
             )
 
+    def start_model_build(self, method):
+        if self.model_build is not None:
+            return
+        self.model_build = queue.Queue()
+        self.collab_button.config(state=tk.DISABLED)
+        self.collab_status.config(text=f"Preparing {self.collab_method.get().lower()} model...")
+        worker = threading.Thread(
+            target=self.model_build_worker, args=(method, self.model_build), daemon=True
+        )
+        worker.start()
+        self.root.after(MODEL_POLL_MS, self.poll_model_build)
+
+    def model_build_worker(self, method, results):
+        # Runs off the Tk thread: must not touch any widget
+        try:
+            build_model(method)
+        except Exception as exc:
+            results.put(exc)
+        else:
+            results.put(None)
+
+    def poll_model_build(self):
+        try:
+            error = self.model_build.get_nowait()
+        except queue.Empty:
+            self.root.after(MODEL_POLL_MS, self.poll_model_build)
+            return
+        self.model_build = None
+        self.collab_button.config(state=tk.NORMAL)
+        self.collab_status.config(text="")
+        if error is not None:
+            messagebox.showerror("Model build failed", str(error))
+            return
+        self.collab_get_recommendations()
+
 
 # ====== Run app ======
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Movie recommendation system")
+    parser.add_argument("--data", metavar="DIR",
+                        help="MovieLens-format directory (movies.csv, ratings.csv) to use instead of the samples")
+    parser.add_argument("--store", metavar="DIR",
+                        help="memory-mapped store built by rating_store.py (starts instantly at any size)")
+    parser.add_argument("--neighbors", metavar="FILE",
+                        help="item neighbor index built by item_knn.py for item-based recommendations")
+    parser.add_argument("--factors", metavar="FILE",
+                        help="model trained by matrix_factorization.py for matrix factorization recommendations")
+    args = parser.parse_args()
+    if args.store:
+        from rating_store import open_store
+        store = open_store(args.store)
+        if store.catalog is None:
+            parser.error(f"{args.store} has no movie catalog")
+        use_dataset(store.catalog, store.matrix, store.genre_index)
+    elif args.data:
+        import movielens
+        use_dataset(movielens.load(args.data))
+    if args.neighbors:
+        import numpy as np
+        from item_knn import ItemNeighbors
+        item_neighbors = ItemNeighbors.load(args.neighbors)
+        if not np.array_equal(item_neighbors.item_ids, rating_matrix.item_ids):
+            parser.error(f"{args.neighbors} was built from a different dataset")
+    if args.factors:
+        import numpy as np
+        from matrix_factorization import MatrixFactorization
+        mf_model = MatrixFactorization.load(args.factors)
+        if not (np.array_equal(mf_model.item_ids, rating_matrix.item_ids)
+                and np.array_equal(mf_model.user_ids, rating_matrix.user_ids)):
+            parser.error(f"{args.factors} was trained on a different dataset")
+
     root = tk.Tk()
     app = MovieRecommenderGUI(root)
     root.mainloop()
@@ -0,0 +1,224 @@
+"""Sparse user-item rating matrix for collaborative filtering.
+
+Ratings are held as a SciPy CSR matrix (users x items) plus a CSC copy for
+column access. User and item IDs are kept as sorted NumPy arrays, so an ID
+is mapped to its row/column with a binary search instead of a dict of
+Python objects.
+
+User-based recommendation computes the same numbers as the original
+dict-based code: the similarity to each user is the cosine over the items
+both have rated, and an unrated item's prediction is the similarity-
+weighted mean of the ratings given by positively similar users. Only the
+columns of items the active user rated are read to find similar users, and
+only those users' rows are read to predict, so a query never scans the
+whole matrix.
+
+    python rating_matrix.py --users 100000 --items 10000   # latency benchmark
+"""
+
+import numpy as np
+import scipy.sparse as sp
+
+from topk import top_k_indices
+
+
+class RatingMatrix:
+    def __init__(self, user_ids, item_ids, csr, csc=None):
+        """user_ids / item_ids: sorted unique IDs labelling the rows / columns.
+
+        `csr` must be a float32 CSR matrix without duplicate entries; `csc`
+        is derived from it unless given (rating_store.py passes a
+        memory-mapped one).
+        """
+        self.user_ids = np.asarray(user_ids)
+        self.item_ids = np.asarray(item_ids)
+        self.csr = csr
+        self.csc = csr.tocsc() if csc is None else csc
+
+    @classmethod
+    def from_triples(cls, users, items, ratings):
+        """Build from parallel arrays of user IDs, item IDs and ratings.
+
+        If a (user, item) pair appears more than once, the last rating wins,
+        as it would in from_dict().
+        """
+        user_ids, rows = np.unique(np.asarray(users), return_inverse=True)
+        item_ids, cols = np.unique(np.asarray(items), return_inverse=True)
+        ratings = np.asarray(ratings, dtype=np.float32)
+        keys = rows.astype(np.int64) * len(item_ids) + cols
+        # First occurrence in the reversed arrays = last occurrence overall
+        _, last = np.unique(keys[::-1], return_index=True)
+        if len(last) < len(keys):
+            keep = len(keys) - 1 - last
+            rows, cols, ratings = rows[keep], cols[keep], ratings[keep]
+        matrix = sp.coo_matrix(
+            (ratings, (rows, cols)),
+            shape=(len(user_ids), len(item_ids)),
+        )
+        return cls(user_ids, item_ids, matrix.tocsr())
+
+    @classmethod
+    def from_dict(cls, ratings):
+        """Build from {user: {item: rating}}."""
+        users, items, values = [], [], []
+        for user, user_ratings in ratings.items():
+            for item, rating in user_ratings.items():
+                users.append(user)
+                items.append(item)
+                values.append(rating)
+        return cls.from_triples(users, items, values)
+
+    @property
+    def shape(self):
+        return self.csr.shape
+
+    @property
+    def nnz(self):
+        return self.csr.nnz
+
+    def rating_counts(self):
+        """Number of ratings per item (column)."""
+        return np.diff(self.csc.indptr)
+
+    # ---- ID mapping ----
+
+    @staticmethod
+    def _lookup(sorted_ids, ids):
+        ids = np.asarray(ids)
+        if not len(sorted_ids):
+            return np.full(ids.shape, -1, dtype=np.int64)
+        pos = np.searchsorted(sorted_ids, ids)
+        pos = np.minimum(pos, len(sorted_ids) - 1)
+        return np.where(sorted_ids[pos] == ids, pos, -1)
+
+    def user_index(self, user_ids):
+        """Row numbers for user IDs (-1 for unknown IDs)."""
+        return self._lookup(self.user_ids, user_ids)
+
+    def item_index(self, item_ids):
+        """Column numbers for item IDs (-1 for unknown IDs)."""
+        return self._lookup(self.item_ids, item_ids)
+
+    def query_vector(self, user_ratings):
+        """Turn {item ID: rating} into (columns, ratings), dropping unknown items."""
+        if not user_ratings:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        cols = self.item_index(list(user_ratings.keys()))
+        vals = np.asarray(list(user_ratings.values()), dtype=np.float32)
+        known = cols >= 0
+        return cols[known], vals[known]
+
+    # ---- user-based collaborative filtering ----
+
+    def user_similarities(self, cols, vals):
+        """Cosine similarity, over co-rated items, of every user to a rating vector.
+
+        Returns (rows, sims) for the users that share at least one item.
+        """
+        if not len(cols):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        sub = self.csc[:, cols].tocsr()
+        rows = np.flatnonzero(np.diff(sub.indptr))
+        sub = sub[rows]
+        rated = sub.copy()
+        rated.data[:] = 1.0
+        num = sub @ vals
+        own_norm = np.sqrt(sub.multiply(sub) @ np.ones(len(cols), dtype=np.float32))
+        query_norm = np.sqrt(rated @ (vals * vals))
+        denom = own_norm * query_norm
+        sims = np.divide(num, denom, out=np.zeros_like(num), where=denom > 0)
+        return rows, sims
+
+    def predict_user_based(self, user_ratings, neighbors=None):
+        """Predicted ratings of unrated items as (columns, predictions).
+
+        neighbors: use only the most similar N users (default: all users
+        with positive similarity, as the original implementation did).
+        """
+        cols, vals = self.query_vector(user_ratings)
+        rows, sims = self.user_similarities(cols, vals)
+        return self.predict_from_users(rows, sims, cols, neighbors)
+
+    def predict_from_users(self, rows, sims, cols, neighbors=None):
+        """Similarity-weighted mean of the ratings of users `rows`, as (columns, predictions).
+
+        Users with non-positive similarity are ignored and the active
+        user's own columns `cols` are never predicted. The users can come
+        from user_similarities() or from an approximate index (ann_index.py).
+        """
+        positive = sims > 0
+        rows, sims = rows[positive], sims[positive]
+        if not len(rows):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if neighbors is not None and len(rows) > neighbors:
+            keep = top_k_indices(sims, neighbors)
+            rows, sims = rows[keep], sims[keep]
+
+        block = self.csr[rows]
+        rated = block.copy()
+        rated.data[:] = 1.0
+        totals = block.T @ sims
+        sim_sums = rated.T @ sims
+        sim_sums[cols] = 0.0    # never recommend what the user already rated
+        candidates = np.flatnonzero(sim_sums > 0)
+        return candidates, totals[candidates] / sim_sums[candidates]
+
+    def recommend_user_based(self, user_ratings, top_n=5, neighbors=None):
+        """Return [(item ID, predicted rating), ...], best first (all of them if top_n is None)."""
+        return self._ranked(*self.predict_user_based(user_ratings, neighbors), top_n)
+
+    def recommend_from_users(self, rows, sims, cols, top_n=5):
+        """recommend_user_based() for an already chosen set of similar users."""
+        return self._ranked(*self.predict_from_users(rows, sims, cols), top_n)
+
+    def _ranked(self, candidates, preds, top_n):
+        # Highest prediction first, ties by item order
+        order = top_k_indices(preds, top_n)
+        return [(self.item_ids[candidates[i]].item(), float(preds[i])) for i in order]
+
+
+def random_matrix(n_users, n_items, per_user=40, seed=0):
+    """Random ratings with a popularity skew, for benchmarks.
+
+    Items drawn twice for the same user keep one rating, so users end up
+    with slightly fewer than `per_user` ratings on average.
+    """
+    rng = np.random.default_rng(seed)
+    counts = rng.poisson(per_user, n_users).clip(1, n_items)
+    users = np.repeat(np.arange(n_users), counts)
+    # Zipf-like item popularity
+    weights = 1.0 / np.arange(1, n_items + 1) ** 0.8
+    items = rng.choice(n_items, size=len(users), p=weights / weights.sum())
+    ratings = rng.integers(1, 6, size=len(users))
+    return RatingMatrix.from_triples(users, items, ratings)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Benchmark user-based recommendations")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--per-user", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--neighbors", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    matrix = random_matrix(args.users, args.items, args.per_user)
+    print(f"built {matrix.shape[0]:,} x {matrix.shape[1]:,} matrix, "
+          f"{matrix.nnz:,} ratings in {time.perf_counter() - start:.2f}s")
+
+    # Query with popular items, which overlap with the most users
+    rng = np.random.default_rng(1)
+    popularity = matrix.rating_counts().astype(np.float64)
+    times = []
+    for _ in range(args.queries):
+        items = rng.choice(matrix.item_ids, size=20, replace=False, p=popularity / popularity.sum())
+        query = {item.item(): int(r) for item, r in zip(items, rng.integers(1, 6, size=20))}
+        start = time.perf_counter()
+        matrix.recommend_user_based(query, top_n=10, neighbors=args.neighbors)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    print(f"recommend: median {1000 * times[len(times) // 2]:.1f} ms, max {1000 * times[-1]:.1f} ms")
@@ -0,0 +1,201 @@
+"""Memory-mapped on-disk rating store.
+
+A store is a directory holding one or more generations, each a
+subdirectory of raw .npy arrays plus a small meta.json, and a CURRENT file
+naming the live generation:
+
+    CURRENT                          e.g. "g000002"
+    g000002/meta.json                shape, dtypes, genre names, format version
+    g000002/user_ids.npy, ...        sorted IDs labelling rows / columns
+    g000002/csr_indptr/indices/data.npy   users x items ratings, row-major
+    g000002/csc_indptr/indices/data.npy   the same ratings, column-major
+    g000002/movie_*.npy, title_*.npy      movie catalog (optional, from movies.csv)
+    g000002/genre_*.npy                   movie genres and the genre_index.GenreIndex over them
+
+open_store() maps every array with np.load(mmap_mode="r") and wraps them
+in SciPy matrices without copying. Opening therefore takes the same time
+for any dataset size, queries only fault in the pages they touch, and
+processes that open the same store share one copy in the page cache. The
+catalog is read the same way: the GUI looks movies up by row or by ID
+(through movie_order) and scores genres from the stored index, and only
+decodes the movies it shows.
+
+A rebuild writes a new generation and then replaces CURRENT, so it never
+renames or overwrites a file another process has mapped (which Windows
+refuses). Older generations are deleted once nothing maps them any more:
+at the next save if they are still in use at this one.
+
+    python rating_store.py build ml-25m ml-25m.store
+    python rating_store.py info ml-25m.store
+"""
+
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+import scipy.sparse as sp
+
+from genre_index import GenreIndex
+from rating_matrix import RatingMatrix
+
+STORE_VERSION = 3
+
+CATALOG_ARRAYS = ("movie_ids", "title_data", "title_offsets", "genre_ptr", "genre_ids")
+CURRENT_NAME = "CURRENT"
+_GENERATION = re.compile(r"g(\d{6})$")
+
+
+class RatingStore:
+    def __init__(self, matrix, catalog=None, genre_index=None):
+        self.matrix = matrix
+        self.catalog = catalog          # movielens.MovieLensData without rating triples, or None
+        self.genre_index = genre_index  # GenreIndex over the catalog, or None
+
+
+def _generations(directory):
+    """Numbers of the complete generations in `directory`, ascending."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(int(m.group(1)) for m in map(_GENERATION.match, os.listdir(directory)) if m)
+
+
+def save_store(directory, matrix, catalog=None):
+    """Write `matrix` (and optionally a MovieLensData catalog) as a new generation of a store."""
+    os.makedirs(directory, exist_ok=True)
+    previous = _generations(directory)
+    name = f"g{(previous[-1] + 1 if previous else 1):06d}"
+    tmp = os.path.join(directory, name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    # indptr and indices share one dtype so SciPy never converts them on open
+    index_dtype = np.int32 if matrix.nnz < 2**31 else np.int64
+    arrays = {
+        "user_ids": matrix.user_ids,
+        "item_ids": matrix.item_ids,
+    }
+    for kind, m in (("csr", matrix.csr), ("csc", matrix.csc)):
+        m = m.copy()
+        m.sort_indices()
+        arrays[f"{kind}_indptr"] = m.indptr.astype(index_dtype)
+        arrays[f"{kind}_indices"] = m.indices.astype(index_dtype)
+        arrays[f"{kind}_data"] = m.data.astype(np.float32)
+    if catalog is not None:
+        for array_name in CATALOG_ARRAYS:
+            arrays[array_name] = getattr(catalog, array_name)
+        arrays["movie_order"] = np.argsort(catalog.movie_ids, kind="stable")
+        index = GenreIndex.from_catalog(catalog)
+        arrays["genre_masks"] = index.masks
+        arrays["genre_index_ptr"] = index.ptr
+        arrays["genre_postings"] = index.postings
+
+    for array_name, array in arrays.items():
+        np.save(os.path.join(tmp, f"{array_name}.npy"), np.ascontiguousarray(array))
+    meta = {
+        "version": STORE_VERSION,
+        "shape": list(matrix.shape),
+        "nnz": int(matrix.nnz),
+        "genre_names": list(catalog.genre_names) if catalog is not None else None,
+    }
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    # Nobody can have the new generation open yet, so renaming it is safe
+    # everywhere; then point CURRENT at it
+    os.rename(tmp, os.path.join(directory, name))
+    current_tmp = os.path.join(directory, CURRENT_NAME + ".tmp")
+    with open(current_tmp, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(current_tmp, os.path.join(directory, CURRENT_NAME))
+
+    # Old generations and leftovers of interrupted saves; on Windows, files
+    # another process still maps can't be deleted and wait for the next save
+    for entry in os.listdir(directory):
+        if entry != name and (_GENERATION.match(entry) or entry.endswith(".tmp")):
+            shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+
+def open_store(directory):
+    """Open the current generation of a store without reading its arrays into memory.
+
+    Raises ValueError if `directory` is not a complete store of this version.
+    """
+    try:
+        with open(os.path.join(directory, CURRENT_NAME), encoding="utf-8") as f:
+            generation = os.path.join(directory, f.read().strip())
+        with open(os.path.join(generation, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"{directory}: not a rating store ({e})") from e
+    if meta.get("version") != STORE_VERSION:
+        raise ValueError(f"{directory}: unsupported store version {meta.get('version')}")
+
+    def load(name):
+        try:
+            return np.load(os.path.join(generation, f"{name}.npy"), mmap_mode="r")
+        except (OSError, ValueError) as e:
+            raise ValueError(f"{directory}: damaged store, cannot map {name} ({e})") from e
+
+    shape = tuple(meta["shape"])
+    csr = sp.csr_matrix((load("csr_data"), load("csr_indices"), load("csr_indptr")), shape=shape, copy=False)
+    csc = sp.csc_matrix((load("csc_data"), load("csc_indices"), load("csc_indptr")), shape=shape, copy=False)
+    csr.has_sorted_indices = True
+    csc.has_sorted_indices = True
+    matrix = RatingMatrix(load("user_ids"), load("item_ids"), csr, csc)
+
+    catalog = genre_index = None
+    if meta.get("genre_names") is not None:
+        from movielens import MovieLensData
+        empty = np.empty(0, dtype=np.int32)
+        catalog = MovieLensData(
+            load("movie_ids"), load("title_data"), load("title_offsets"),
+            meta["genre_names"], load("genre_ptr"), load("genre_ids"),
+            empty, empty, np.empty(0, dtype=np.float32), movie_order=load("movie_order"),
+        )
+        genre_index = GenreIndex(list(meta["genre_names"]), load("genre_masks"),
+                                 load("genre_index_ptr"), load("genre_postings"))
+    return RatingStore(matrix, catalog, genre_index)
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build or inspect a memory-mapped rating store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="build a store from a MovieLens-format directory")
+    build.add_argument("source")
+    build.add_argument("store")
+    info = sub.add_parser("info", help="open a store and time a few queries")
+    info.add_argument("store")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        import movielens
+        start = time.perf_counter()
+        data = movielens.load(args.source)
+        save_store(args.store, data.to_rating_matrix(), data)
+        print(f"built {args.store} in {time.perf_counter() - start:.2f}s")
+        return
+
+    start = time.perf_counter()
+    store = open_store(args.store)
+    opened = time.perf_counter() - start
+    matrix = store.matrix
+    print(f"{matrix.shape[0]:,} users x {matrix.shape[1]:,} items, {matrix.nnz:,} ratings; "
+          f"opened in {1000 * opened:.1f} ms")
+
+    rng = np.random.default_rng(0)
+    counts = matrix.rating_counts().astype(np.float64)
+    for _ in range(3):
+        items = rng.choice(len(counts), size=min(10, len(counts)), replace=False, p=counts / counts.sum())
+        query = {matrix.item_ids[i].item(): 5 for i in items}
+        start = time.perf_counter()
+        matrix.recommend_user_based(query, top_n=10)
+        print(f"query: {1000 * (time.perf_counter() - start):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
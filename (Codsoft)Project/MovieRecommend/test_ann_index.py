@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from ann_index import build_lsh_index, clustered_vectors, exact_search
+
+
+@pytest.fixture(scope="module")
+def data():
+    vectors = clustered_vectors(10000, clusters=100, seed=1)
+    queries, base = vectors[:100], vectors[100:]
+    return queries, build_lsh_index(base)
+
+
+def test_default_recall_at_50(data):
+    queries, index = data
+    hits = 0
+    for q in queries:
+        expected = exact_search(index.vectors, q, 50)[0]
+        hits += len(np.intersect1d(expected, index.query(q, k=50)[0]))
+    assert hits / (50 * len(queries)) >= 0.9
+
+
+def test_query_ranks_candidates_exactly(data):
+    queries, index = data
+    rows, sims = index.query(queries[0], k=20)
+    candidates = index.candidates(queries[0])
+    assert np.isin(rows, candidates).all()
+    assert np.all(np.diff(sims) <= 0)
+    assert np.allclose(sims, index.vectors[rows] @ (queries[0] / np.linalg.norm(queries[0])))
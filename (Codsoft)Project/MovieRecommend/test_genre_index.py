@@ -0,0 +1,38 @@
+import pytest
+
+from genre_index import GenreIndex
+
+MOVIES = [
+    {"genres": ["Drama"]},
+    {"genres": ["Comedy", "Romance"]},
+    {"genres": ["Action", "Comedy", "Romance"]},
+    {"genres": ["Horror"]},
+    {"genres": ["Comedy"]},
+    {"genres": ["Romance", "Comedy", "Drama"]},
+]
+
+
+@pytest.fixture
+def index():
+    return GenreIndex.from_movies(MOVIES)
+
+
+def brute_force(liked):
+    scored = [(row, len(set(m["genres"]) & set(liked))) for row, m in enumerate(MOVIES)]
+    return sorted([(row, s) for row, s in scored if s], key=lambda pair: -pair[1])
+
+
+@pytest.mark.parametrize("liked", [
+    ["Comedy"],
+    ["Comedy", "Romance"],
+    ["Comedy", "Romance", "Drama"],
+    ["Horror", "Action"],
+    ["Western"],
+])
+def test_recommend_matches_brute_force(index, liked):
+    assert index.recommend(liked, top_n=None) == brute_force(liked)
+    assert index.recommend(liked, top_n=2) == brute_force(liked)[:2]
+
+
+def test_best_match_first(index):
+    assert index.recommend(["Comedy", "Romance", "Drama"], top_n=1) == [(5, 3)]
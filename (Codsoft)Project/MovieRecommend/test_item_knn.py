@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from item_knn import ItemNeighbors, build_item_neighbors
+from rating_matrix import random_matrix
+
+
+def cosine_matrix(matrix, adjusted):
+    x = matrix.csr.toarray().astype(np.float64)
+    rated = x != 0
+    if adjusted:
+        counts = rated.sum(axis=1)
+        means = np.divide(x.sum(axis=1), counts, out=np.zeros(len(x)), where=counts > 0)
+        x = np.where(rated, x - means[:, None], 0.0)
+    norms = np.linalg.norm(x, axis=0)
+    n = x.shape[1]
+    sims = np.zeros((n, n))
+    for i in range(n):
+        for j in range(n):
+            if j != i and norms[i] > 0 and norms[j] > 0:
+                sims[i, j] = x[:, i] @ x[:, j] / (norms[i] * norms[j])
+    return sims
+
+
+@pytest.mark.parametrize("adjusted", [True, False])
+@pytest.mark.parametrize("block_bytes", [64 * 2**20, 200])
+def test_matches_brute_force(adjusted, block_bytes):
+    matrix = random_matrix(80, 30, per_user=8, seed=3)
+    k = 5
+    index = build_item_neighbors(matrix, k=k, adjusted=adjusted, block_bytes=block_bytes)
+    cosine = cosine_matrix(matrix, adjusted)
+    for i in range(matrix.shape[1]):
+        best = sorted(cosine[i][cosine[i] > 1e-6], reverse=True)[:k]
+        found = len(best)
+        assert np.allclose(index.sims[i, :found], best, atol=1e-5)
+        # Neighbors with (nearly) tied similarities may come in either order,
+        # so check each one's true similarity rather than its position
+        assert np.allclose(cosine[i, index.neighbors[i, :found]], best, atol=1e-5)
+        assert (index.neighbors[i, found:] == -1).all() and (index.sims[i, found:] == 0).all()
+
+
+def test_predict_is_the_weighted_mean_over_rated_neighbors():
+    item_ids = np.array([10, 20, 30, 40])
+    neighbors = np.array([
+        [2, 1],     # 10: 30 (0.5), 20 (0.25)
+        [2, -1],    # 20: 30 (0.8)
+        [3, 0],     # 30: 40 (0.6), 10 (0.1)
+        [-1, -1],   # 40: none
+    ], dtype=np.int32)
+    sims = np.array([[0.5, 0.25], [0.8, 0.0], [0.6, 0.1], [0.0, 0.0]], dtype=np.float32)
+    index = ItemNeighbors(item_ids, neighbors, sims)
+
+    cols, preds = index.predict({10: 4.0, 20: 2.0, 99: 5.0})
+    # 30 is a neighbor of 10 (0.5, rated 4) and of 20 (0.8, rated 2);
+    # 20 is a neighbor of 10 but already rated, so it is not predicted
+    assert cols.tolist() == [2]
+    assert preds[0] == pytest.approx((0.5 * 4 + 0.8 * 2) / (0.5 + 0.8))
+
+    # Equal predictions rank in item order
+    assert index.recommend({30: 3.0}) == [(10, pytest.approx(3.0)), (40, pytest.approx(3.0))]
+    assert index.predict({})[0].tolist() == []
+
+
+def test_save_and_load(tmp_path):
+    index = build_item_neighbors(random_matrix(50, 20, per_user=6), k=4)
+    path = str(tmp_path / "neighbors.npz")
+    index.save(path)
+    loaded = ItemNeighbors.load(path)
+    assert np.array_equal(loaded.neighbors, index.neighbors)
+    assert np.array_equal(loaded.sims, index.sims)
+    assert loaded.adjusted == index.adjusted
@@ -0,0 +1,66 @@
+import logging
+import re
+
+import numpy as np
+import pytest
+
+from matrix_factorization import MatrixFactorization, split_holdout, train_als
+from rating_matrix import RatingMatrix
+
+
+@pytest.fixture(scope="module")
+def low_rank():
+    """Ratings from a planted rank-3 model plus a little noise, 30% observed."""
+    rng = np.random.default_rng(0)
+    users, items, rank = 300, 80, 3
+    u = rng.standard_normal((users, rank))
+    v = rng.standard_normal((items, rank))
+    rows, cols = np.nonzero(rng.random((users, items)) < 0.3)
+    ratings = 3 + 0.5 * np.einsum("ij,ij->i", u[rows], v[cols]) + rng.normal(0, 0.1, len(rows))
+    return RatingMatrix.from_triples(rows, cols, ratings)
+
+
+@pytest.fixture(scope="module")
+def model(low_rank):
+    train, _ = split_holdout(low_rank, 0.2)
+    return train, train_als(train, rank=3, reg=0.05, iterations=10)
+
+
+def test_holdout_rmse_drops_across_iterations(low_rank, caplog):
+    train, holdout = split_holdout(low_rank, 0.2)
+    assert train.nnz + len(holdout[2]) == low_rank.nnz
+
+    with caplog.at_level(logging.INFO, logger="recommender.mf"):
+        model = train_als(train, rank=3, reg=0.05, iterations=10, holdout=holdout)
+    rmses = [float(x) for x in re.findall(r"holdout RMSE ([\d.]+)", caplog.text)]
+    assert len(rmses) == 10
+    assert rmses[-1] < 0.5 * rmses[0]
+    assert rmses[-1] == pytest.approx(model.rmse(*holdout), abs=1e-4)
+    # Within a few times the noise level
+    assert rmses[-1] < 0.3
+
+
+def test_nothing_is_logged_by_default(low_rank, caplog):
+    with caplog.at_level(logging.WARNING, logger="recommender.mf"):
+        train_als(low_rank, rank=3, iterations=2)
+    assert caplog.records == []
+
+
+def test_fold_in_reproduces_a_training_users_factors(model):
+    train, mf = model
+    for row in range(20):
+        ratings = train.csr[row]
+        folded = mf.fold_in(ratings.indices, ratings.data)
+        stored = mf.user_factors[row]
+        assert np.linalg.norm(folded - stored) < 0.05 * np.linalg.norm(stored)
+
+
+def test_save_and_load_keep_recommendations(model, tmp_path):
+    train, mf = model
+    path = str(tmp_path / "factors.npz")
+    mf.save(path)
+    loaded = MatrixFactorization.load(path)
+    query = {int(train.item_ids[i]): r for i, r in [(0, 5.0), (7, 1.5), (12, 4.0)]}
+    assert loaded.recommend(query, top_n=10) == mf.recommend(query, top_n=10)
+    assert loaded.rating_range == mf.rating_range
+    assert np.array_equal(loaded.user_ids, mf.user_ids)
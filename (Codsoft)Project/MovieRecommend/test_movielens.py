@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pytest
+
+import movielens
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    directory = str(tmp_path / "ml")
+    movielens.generate_synthetic(directory, n_users=50, n_movies=30, ratings_per_user=8)
+    return directory
+
+
+def cache_path(directory):
+    return os.path.join(directory, movielens.CACHE_NAME)
+
+
+def assert_same(a, b):
+    assert a.movie_dicts() == b.movie_dicts()
+    for name in ("users", "items", "ratings"):
+        assert np.array_equal(getattr(a, name), getattr(b, name))
+
+
+def test_cache_round_trip(dataset):
+    parsed = movielens.load(dataset)
+    assert os.path.exists(cache_path(dataset))
+    assert_same(movielens.load(dataset), parsed)
+    assert [f for f in os.listdir(dataset) if f.endswith(".tmp")] == []
+
+
+def truncate(path):
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) // 2)
+
+
+def garbage(path):
+    with open(path, "wb") as f:
+        f.write(b"not a zip file at all")
+
+
+def missing_array(path):
+    with np.load(path) as f:
+        arrays = {name: f[name] for name in f.files if name != "ratings"}
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+
+@pytest.mark.parametrize("damage", [truncate, garbage, missing_array])
+def test_damaged_cache_is_rebuilt(dataset, damage):
+    expected = movielens.load(dataset, cache=False)
+    movielens.load(dataset)
+    damage(cache_path(dataset))
+
+    assert movielens.MovieLensData.load_cache(cache_path(dataset)) is None
+    assert_same(movielens.load(dataset), expected)
+    # ... and the rebuilt cache is good again
+    assert movielens.MovieLensData.load_cache(cache_path(dataset)) is not None
+
+
+def test_failed_save_leaves_no_partial_file(dataset, monkeypatch):
+    data = movielens.load(dataset, cache=False)
+    path = cache_path(dataset)
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(np, "savez", fail)
+    with pytest.raises(OSError):
+        data.save(path)
+    assert sorted(os.listdir(dataset)) == ["movies.csv", "ratings.csv"]
+
+
+def test_lazy_movie_views(dataset):
+    data = movielens.load(dataset, cache=False)
+    movies = data.movie_dicts()
+    rows = movielens.MovieList(data)
+    by_id = movielens.MoviesById(data)
+
+    assert len(rows) == len(by_id) == len(movies)
+    assert rows[0] == movies[0] and rows[-1] == movies[-1]
+    assert rows[2:5] == movies[2:5]
+    assert list(rows) == movies
+    for movie in movies:
+        assert by_id[movie["id"]] == movie
+    assert -1 not in by_id
+    assert by_id.get(10**6) is None
+    assert sorted(by_id) == sorted(m["id"] for m in movies)
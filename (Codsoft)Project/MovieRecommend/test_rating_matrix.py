@@ -0,0 +1,88 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from rating_matrix import RatingMatrix, random_matrix
+
+
+def test_duplicate_pairs_keep_the_last_rating():
+    matrix = RatingMatrix.from_triples(
+        users=[1, 2, 1, 1, 2],
+        items=[10, 10, 20, 10, 10],
+        ratings=[5, 1, 3, 2, 4],
+    )
+    assert matrix.nnz == 3
+    assert matrix.csr.toarray().tolist() == [[2, 3], [4, 0]]
+    assert matrix.csc.toarray().tolist() == [[2, 3], [4, 0]]
+
+
+def test_from_triples_matches_from_dict():
+    ratings = {1: {10: 5, 20: 3}, 2: {10: 4}, 3: {30: 1}}
+    users, items, values = zip(*[(u, i, r) for u, row in ratings.items() for i, r in row.items()])
+    a = RatingMatrix.from_dict(ratings)
+    b = RatingMatrix.from_triples(users, items, values)
+    assert np.array_equal(a.csr.toarray(), b.csr.toarray())
+    assert a.recommend_user_based({10: 5}) == b.recommend_user_based({10: 5})
+
+
+def test_random_matrix_ratings_are_not_summed():
+    # 30 draws from 50 items per user always repeat some items
+    matrix = random_matrix(200, 50, per_user=30)
+    assert matrix.csr.data.min() >= 1
+    assert matrix.csr.data.max() <= 5
+
+
+# The sample users of movie_recommender_gui.py, with titles replaced by IDs
+SAMPLE_RATINGS = {
+    "User1": {1: 5, 2: 4, 3: 1, 5: 5, 6: 5, 7: 4},
+    "User2": {3: 5, 4: 4, 8: 5, 10: 5},
+    "User3": {1: 4, 2: 5, 7: 5, 9: 3},
+    "User4": {5: 4, 9: 4, 2: 4, 6: 4},
+}
+
+
+def dict_cosine(r1, r2):
+    common = set(r1).intersection(r2)
+    if not common:
+        return 0.0
+    num = sum(r1[m] * r2[m] for m in common)
+    sum1 = math.sqrt(sum(r1[m] ** 2 for m in common))
+    sum2 = math.sqrt(sum(r2[m] ** 2 for m in common))
+    if sum1 == 0 or sum2 == 0:
+        return 0.0
+    return num / (sum1 * sum2)
+
+
+def dict_recommend(ratings, user_ratings):
+    """The original dict-based user CF: {item: predicted rating}."""
+    sims = {}
+    for user, other in ratings.items():
+        sim = dict_cosine(user_ratings, other)
+        if sim > 0:
+            sims[user] = sim
+    totals, sim_sums = {}, {}
+    for user, sim in sims.items():
+        for item, rating in ratings[user].items():
+            if item in user_ratings:
+                continue
+            totals[item] = totals.get(item, 0.0) + sim * rating
+            sim_sums[item] = sim_sums.get(item, 0.0) + sim
+    return {item: totals[item] / sim_sums[item] for item in totals if sim_sums[item] > 0}
+
+
+def test_user_based_matches_the_dict_implementation():
+    matrix = RatingMatrix.from_dict(SAMPLE_RATINGS)
+    rng = random.Random(0)
+    queries = [{1: 5}, {3: 5, 4: 5}, {9: 1}, {2: 2, 8: 4, 10: 1}]
+    queries += [
+        {item: rng.randint(1, 5) for item in rng.sample(range(1, 11), rng.randint(1, 6))}
+        for _ in range(50)
+    ]
+    for query in queries:
+        expected = dict_recommend(SAMPLE_RATINGS, query)
+        found = matrix.recommend_user_based(query, top_n=None)
+        assert dict(found) == pytest.approx(expected, rel=1e-5)
+        preds = [pred for _, pred in found]
+        assert preds == sorted(preds, reverse=True)
@@ -0,0 +1,137 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import movielens
+import rating_store
+from genre_index import GenreIndex
+from rating_store import open_store, save_store
+
+
+@pytest.fixture(scope="module")
+def data(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("ml"))
+    movielens.generate_synthetic(directory, n_users=60, n_movies=40, ratings_per_user=10)
+    return movielens.load(directory, cache=False)
+
+
+def current_generation(directory):
+    with open(os.path.join(directory, rating_store.CURRENT_NAME), encoding="utf-8") as f:
+        return os.path.join(directory, f.read())
+
+
+def assert_same_matrix(a, b):
+    assert np.array_equal(a.user_ids, b.user_ids)
+    assert np.array_equal(a.item_ids, b.item_ids)
+    for kind in ("csr", "csc"):
+        x, y = getattr(a, kind), getattr(b, kind)
+        assert (x != y).nnz == 0
+        assert np.array_equal(x.indptr, y.indptr)
+        assert np.array_equal(x.indices, y.indices)
+        assert np.array_equal(x.data, y.data)
+
+
+def test_round_trip(tmp_path, data):
+    directory = str(tmp_path / "store")
+    matrix = data.to_rating_matrix()
+    matrix.csr.sort_indices()
+    matrix.csc.sort_indices()
+    save_store(directory, matrix, data)
+
+    store = open_store(directory)
+    assert_same_matrix(store.matrix, matrix)
+    assert store.catalog.movie_dicts() == data.movie_dicts()
+    query = {int(matrix.item_ids[0]): 5, int(matrix.item_ids[3]): 2}
+    assert store.matrix.recommend_user_based(query, 10) == matrix.recommend_user_based(query, 10)
+
+
+def test_arrays_are_memory_mapped(tmp_path, data):
+    directory = str(tmp_path / "store")
+    save_store(directory, data.to_rating_matrix(), data)
+    store = open_store(directory)
+    m = store.matrix
+    arrays = [m.user_ids, m.item_ids, m.csr.data, m.csr.indices, m.csr.indptr,
+              m.csc.data, m.csc.indices, m.csc.indptr, store.catalog.title_data]
+    for array in arrays:
+        # SciPy may wrap the map in a view, but never copies it
+        base = array
+        while not isinstance(base, np.memmap) and base.base is not None:
+            base = base.base
+        assert isinstance(base, np.memmap)
+
+
+def test_rebuild_leaves_open_store_readable(tmp_path, data):
+    directory = str(tmp_path / "store")
+    matrix = data.to_rating_matrix()
+    save_store(directory, matrix)
+    old = open_store(directory)
+    first = current_generation(directory)
+
+    smaller = movielens.MovieLensData(
+        data.movie_ids, data.title_data, data.title_offsets, data.genre_names,
+        data.genre_ptr, data.genre_ids, data.users[:100], data.items[:100], data.ratings[:100],
+    )
+    save_store(directory, smaller.to_rating_matrix())
+    assert current_generation(directory) != first
+    assert open_store(directory).matrix.nnz == smaller.to_rating_matrix().nnz
+    # The first process still reads its own generation
+    assert old.matrix.nnz == matrix.nnz
+    assert old.matrix.csr.sum() == pytest.approx(matrix.csr.sum())
+
+
+def test_interrupted_save_is_ignored_and_cleaned_up(tmp_path, data):
+    directory = str(tmp_path / "store")
+    matrix = data.to_rating_matrix()
+    save_store(directory, matrix)
+    # A save that died before switching CURRENT over
+    partial = os.path.join(directory, "g000002.tmp")
+    os.makedirs(partial)
+    with open(os.path.join(partial, "csr_data.npy"), "wb") as f:
+        f.write(b"\x93NUMPY")
+
+    assert open_store(directory).matrix.nnz == matrix.nnz
+    save_store(directory, matrix)
+    assert sorted(os.listdir(directory)) == [rating_store.CURRENT_NAME, "g000002"]
+
+
+def test_stale_version_is_rejected(tmp_path, data):
+    directory = str(tmp_path / "store")
+    save_store(directory, data.to_rating_matrix())
+    meta_path = os.path.join(current_generation(directory), "meta.json")
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    meta["version"] = rating_store.STORE_VERSION - 1
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    with pytest.raises(ValueError, match="version"):
+        open_store(directory)
+
+
+def test_missing_or_damaged_store_is_rejected(tmp_path, data):
+    with pytest.raises(ValueError):
+        open_store(str(tmp_path / "nothing here"))
+
+    directory = str(tmp_path / "store")
+    save_store(directory, data.to_rating_matrix())
+    os.remove(os.path.join(current_generation(directory), "csc_indices.npy"))
+    with pytest.raises(ValueError, match="csc_indices"):
+        open_store(directory)
+
+
+def test_catalog_lookups_come_from_the_store(tmp_path, data):
+    directory = str(tmp_path / "store")
+    save_store(directory, data.to_rating_matrix(), data)
+    store = open_store(directory)
+
+    built = GenreIndex.from_catalog(data)
+    for name in ("masks", "ptr", "postings"):
+        assert np.array_equal(getattr(store.genre_index, name), getattr(built, name))
+        assert isinstance(getattr(store.genre_index, name), np.memmap)
+    for liked in (["Comedy"], ["Drama", "Horror", "Western"]):
+        assert store.genre_index.recommend(liked, None) == built.recommend(liked, None)
+
+    assert isinstance(store.catalog.movie_order, np.memmap)
+    ids = data.movie_ids[::-1].tolist() + [10**6]
+    assert store.catalog.movie_rows(ids).tolist() == list(range(data.n_movies))[::-1] + [-1]
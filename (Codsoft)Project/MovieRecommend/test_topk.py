@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from topk import top_k, top_k_indices
+
+
+def stable_ranking(scores):
+    return sorted(range(len(scores)), key=lambda i: -scores[i])
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("k", [None, 0, 1, 3, 10, 50])
+def test_matches_a_stable_sort(seed, k):
+    scores = np.random.default_rng(seed).integers(0, 5, 30).astype(np.float32)
+    expected = stable_ranking(scores.tolist())
+    assert top_k_indices(scores, k).tolist() == expected[:k]
+
+
+def test_empty():
+    assert top_k_indices(np.empty(0), 3).tolist() == []
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint64, np.int8, np.bool_])
+@pytest.mark.parametrize("k", [None, 1, 4])
+def test_unsigned_and_bool_scores(dtype, k):
+    scores = np.array([0, 3, 1, 0, 3, 2, 1], dtype=np.int64)
+    if dtype is np.bool_:
+        scores = scores > 1
+    expected = stable_ranking(scores.tolist())
+    assert top_k_indices(scores.astype(dtype), k).tolist() == expected[:k]
+
+
+def test_uint64_beyond_int64():
+    scores = np.array([1, 2**63 + 5, 0, 2**64 - 1], dtype=np.uint64)
+    assert top_k_indices(scores, 2).tolist() == [3, 1]
+    assert top_k_indices(scores).tolist() == [3, 1, 0, 2]
+
+
+@pytest.mark.parametrize("k", [None, 0, 1, 3, 10, 50])
+def test_top_k_from_a_generator(k):
+    scores = np.random.default_rng(7).integers(0, 5, 30).tolist()
+    pairs = ((f"item{i}", s) for i, s in enumerate(scores))
+    expected = [(f"item{i}", scores[i]) for i in stable_ranking(scores)][:k]
+    assert top_k(pairs, k, key=lambda pair: pair[1]) == expected
+
+
+def test_top_k_ties_keep_input_order_without_comparing_items():
+    # dicts can't be compared, so a tie must never fall through to the items
+    items = [{"id": i, "score": s} for i, s in enumerate([2, 5, 2, 5, 1])]
+    ranked = top_k(iter(items), 3, key=lambda item: item["score"])
+    assert [item["id"] for item in ranked] == [1, 3, 0]
+    assert top_k([3, 1, 2]) == [3, 2, 1]
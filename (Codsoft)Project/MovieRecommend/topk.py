@@ -0,0 +1,63 @@
+"""Top-K selection shared by the recommenders.
+
+Every recommender ranks best score first and breaks ties by position (the
+earlier candidate wins), matching a stable descending sort, but without
+sorting everything when only a handful of results are shown:
+
+    top_k_indices(scores, k)   NumPy arrays: argpartition, O(n + k log k)
+    top_k(iterable, k, key)    any iterable or generator: a k-sized heap,
+                               O(n log k) time and O(k) memory
+"""
+
+import heapq
+
+import numpy as np
+
+
+def _descending(scores):
+    """A key whose ascending order is `scores` in descending order.
+
+    Plain negation wraps around for unsigned integers (and fails for bools).
+    """
+    if scores.dtype.kind == "u":
+        return np.iinfo(scores.dtype).max - scores
+    if scores.dtype.kind == "b":
+        return ~scores
+    return -scores
+
+
+def top_k_indices(scores, k=None):
+    """Indices of the k highest `scores`, best first, ties by lower index.
+
+    k=None ranks every index.
+    """
+    key = _descending(np.asarray(scores))
+    n = len(key)
+    if k is None or k >= n:
+        return np.lexsort((np.arange(n), key))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    # argpartition finds the k-th best score; which of several entries tied
+    # with it it keeps is arbitrary, so take those in index order instead
+    threshold = key[np.argpartition(key, k - 1)[k - 1]]
+    above = np.flatnonzero(key < threshold)
+    tied = np.flatnonzero(key == threshold)[:k - len(above)]
+    chosen = np.concatenate([above, tied])
+    return chosen[np.lexsort((chosen, key[chosen]))]
+
+
+def top_k(iterable, k=None, key=None):
+    """The k largest items of `iterable` by `key`, best first, ties in input order.
+
+    `iterable` is consumed once, so candidates can come from a generator;
+    k=None returns everything, sorted.
+    """
+    score = (lambda item: item) if key is None else key
+    # The negated position breaks ties in favour of the earlier item and
+    # keeps the items themselves out of the comparison
+    keyed = ((score(item), -i, item) for i, item in enumerate(iterable))
+    if k is None:
+        ranked = sorted(keyed, key=lambda entry: entry[:2], reverse=True)
+    else:
+        ranked = heapq.nlargest(k, keyed, key=lambda entry: entry[:2])
+    return [item for _, _, item in ranked]
@@ -0,0 +1,194 @@
+"""Bitboard Tic-Tac-Toe engine.
+
+Each player is stored as a 9-bit integer (bit i set = cell i taken), so win
+checks become a table lookup and empty cells are enumerated with bit tricks
+instead of scanning a list of strings. `best_move(board)` accepts the same
+list board as the GUI engine and returns the same move.
+"""
+
+from transposition import EXACT, LOWER, UPPER, TranspositionTable, canonical_key
+
+HUMAN = 'X'
+AI = 'O'
+EMPTY = ' '
+
+FULL = 0b111111111
+
+WIN_MASKS = (
+    0b000000111,
+    0b000111000,
+    0b111000000,
+    0b001001001,
+    0b010010010,
+    0b100100100,
+    0b100010001,
+    0b001010100,
+)
+
+# WIN_TABLE[bits] is 1 when the 9-bit pattern contains a complete line
+WIN_TABLE = bytes(
+    1 if any(bits & m == m for m in WIN_MASKS) else 0
+    for bits in range(FULL + 1)
+)
+
+
+# Static move order: centre, corners, then edges
+MOVE_ORDER = tuple(1 << i for i in (4, 0, 2, 6, 8, 1, 3, 5, 7))
+
+
+def ordered_moves(own_bits, other_bits, empty):
+    """Empty cells as bits, best first; a win or a forced block is returned alone."""
+    for bit in MOVE_ORDER:
+        if empty & bit and WIN_TABLE[own_bits | bit]:
+            return (bit,)
+    for bit in MOVE_ORDER:
+        if empty & bit and WIN_TABLE[other_bits | bit]:
+            # Any other move lets the opponent win next turn
+            return (bit,)
+    return tuple(bit for bit in MOVE_ORDER if empty & bit)
+
+
+def to_bitboards(board):
+    ai_bits = 0
+    human_bits = 0
+    for i, cell in enumerate(board):
+        if cell == AI:
+            ai_bits |= 1 << i
+        elif cell == HUMAN:
+            human_bits |= 1 << i
+    return ai_bits, human_bits
+
+
+def get_winner(ai_bits, human_bits):
+    if WIN_TABLE[ai_bits]:
+        return AI
+    if WIN_TABLE[human_bits]:
+        return HUMAN
+    return None
+
+
+def minimax(ai_bits, human_bits, alpha, beta, is_maximizing):
+    """Score a position in which neither side has won yet (+1 AI, -1 human)."""
+    occupied = ai_bits | human_bits
+    if occupied == FULL:
+        return 0
+    empty = FULL ^ occupied
+
+    if is_maximizing:
+        max_eval = -2
+        while empty:
+            bit = empty & -empty
+            empty ^= bit
+            child = ai_bits | bit
+            if WIN_TABLE[child]:
+                return 1
+            eval_value = minimax(child, human_bits, alpha, beta, False)
+            if eval_value > max_eval:
+                max_eval = eval_value
+                if eval_value > alpha:
+                    alpha = eval_value
+                    if beta <= alpha:
+                        break
+        return max_eval
+    else:
+        min_eval = 2
+        while empty:
+            bit = empty & -empty
+            empty ^= bit
+            child = human_bits | bit
+            if WIN_TABLE[child]:
+                return -1
+            eval_value = minimax(ai_bits, child, alpha, beta, True)
+            if eval_value < min_eval:
+                min_eval = eval_value
+                if eval_value < beta:
+                    beta = eval_value
+                    if beta <= alpha:
+                        break
+        return min_eval
+
+
+def minimax_tt(ai_bits, human_bits, alpha, beta, is_maximizing, table):
+    """Same as `minimax`, but reuses results stored in a transposition table
+    and tries moves in `ordered_moves` order."""
+    occupied = ai_bits | human_bits
+    if occupied == FULL:
+        return 0
+
+    key = canonical_key(ai_bits, human_bits, is_maximizing)
+    entry = table.lookup(key)
+    if entry is not None:
+        value, flag = entry
+        if flag == EXACT:
+            return value
+        if flag == LOWER and value >= beta:
+            return value
+        if flag == UPPER and value <= alpha:
+            return value
+
+    alpha_orig = alpha
+    beta_orig = beta
+    empty = FULL ^ occupied
+
+    if is_maximizing:
+        best = -2
+        for bit in ordered_moves(ai_bits, human_bits, empty):
+            child = ai_bits | bit
+            if WIN_TABLE[child]:
+                best = 1
+                break
+            eval_value = minimax_tt(child, human_bits, alpha, beta, False, table)
+            if eval_value > best:
+                best = eval_value
+                if eval_value > alpha:
+                    alpha = eval_value
+                    if beta <= alpha:
+                        break
+    else:
+        best = 2
+        for bit in ordered_moves(human_bits, ai_bits, empty):
+            child = human_bits | bit
+            if WIN_TABLE[child]:
+                best = -1
+                break
+            eval_value = minimax_tt(ai_bits, child, alpha, beta, True, table)
+            if eval_value < best:
+                best = eval_value
+                if eval_value < beta:
+                    beta = eval_value
+                    if beta <= alpha:
+                        break
+
+    if best <= alpha_orig:
+        table.store(key, best, UPPER)
+    elif best >= beta_orig:
+        table.store(key, best, LOWER)
+    else:
+        table.store(key, best, EXACT)
+    return best
+
+
+# Shared across calls so positions solved on earlier moves stay cached
+TRANSPOSITION_TABLE = TranspositionTable()
+
+
+def best_move(board, table=TRANSPOSITION_TABLE):
+    """Return the AI's move; pass table=None to search without caching."""
+    ai_bits, human_bits = to_bitboards(board)
+    empty = FULL ^ (ai_bits | human_bits)
+    best_val = -2
+    move = -1
+    while empty:
+        bit = empty & -empty
+        empty ^= bit
+        child = ai_bits | bit
+        if WIN_TABLE[child]:
+            move_val = 1
+        elif table is None:
+            move_val = minimax(child, human_bits, -2, 2, False)
+        else:
+            move_val = minimax_tt(child, human_bits, -2, 2, False, table)
+        if move_val > best_val:
+            best_val = move_val
+            move = bit.bit_length() - 1
+    return move
@@ -0,0 +1,145 @@
+"""Precomputed perfect-play table for 3x3 Tic-Tac-Toe.
+
+Every legal, unfinished position is solved once by the bitboard engine and
+the AI's best move is written to a small binary file, one byte per position
+indexed by the base-3 encoding of the board. At runtime the file is
+memory-mapped on the first lookup; if it is missing, corrupt or from an
+older table version, `best_move` falls back to searching.
+
+Build the table with:  python move_table.py
+"""
+
+import mmap
+import os
+import sys
+import zlib
+
+import bitboard_engine
+from bitboard_engine import FULL, WIN_TABLE
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perfect_play.bin")
+
+MAGIC = b"TTT1"
+# Bump whenever the engine's choice of move can change
+TABLE_VERSION = 2
+NO_MOVE = 0xFF
+POSITIONS = 3 ** 9
+HEADER_SIZE = len(MAGIC) + 1 + 4
+
+# TERNARY[bits] is the base-3 weight of the cells set in `bits`
+TERNARY = tuple(
+    sum(3 ** i for i in range(9) if bits >> i & 1)
+    for bits in range(FULL + 1)
+)
+
+
+def position_index(ai_bits, human_bits):
+    return TERNARY[ai_bits] + 2 * TERNARY[human_bits]
+
+
+def _walk(ai_bits, human_bits, ai_to_move, seen, positions):
+    """Collect every unfinished position where the AI is to move into `positions`."""
+    if WIN_TABLE[ai_bits] or WIN_TABLE[human_bits] or (ai_bits | human_bits) == FULL:
+        return
+    # The same stones can be reached with either side to move (from the
+    # two openings), so the side to move is part of the key
+    key = (ai_bits, human_bits, ai_to_move)
+    if key in seen:
+        return
+    seen.add(key)
+    if ai_to_move:
+        positions.append((ai_bits, human_bits))
+    empty = FULL ^ (ai_bits | human_bits)
+    while empty:
+        bit = empty & -empty
+        empty ^= bit
+        if ai_to_move:
+            _walk(ai_bits | bit, human_bits, False, seen, positions)
+        else:
+            _walk(ai_bits, human_bits | bit, True, seen, positions)
+
+
+def reachable_positions():
+    """(ai_bits, human_bits) of every AI-to-move position, whoever opened."""
+    seen = set()
+    positions = []
+    _walk(0, 0, True, seen, positions)    # AI opens
+    _walk(0, 0, False, seen, positions)   # human opens
+    return positions
+
+
+def solve_all():
+    """Return a bytearray holding the AI's best move for every unfinished position."""
+    positions = reachable_positions()
+
+    table = bytearray([NO_MOVE]) * POSITIONS
+    board = [bitboard_engine.EMPTY] * 9
+    for ai_bits, human_bits in positions:
+        for i in range(9):
+            if ai_bits >> i & 1:
+                board[i] = bitboard_engine.AI
+            elif human_bits >> i & 1:
+                board[i] = bitboard_engine.HUMAN
+            else:
+                board[i] = bitboard_engine.EMPTY
+        table[position_index(ai_bits, human_bits)] = bitboard_engine.best_move(board)
+    return table
+
+
+def build_table(path=TABLE_PATH):
+    payload = solve_all()
+    header = MAGIC + bytes([TABLE_VERSION]) + zlib.crc32(payload).to_bytes(4, "little")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return len(header) + len(payload)
+
+
+def load_table(path=TABLE_PATH):
+    """Memory-map the table, or return None if it is missing or stale."""
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if (
+        len(data) != HEADER_SIZE + POSITIONS
+        or data[:len(MAGIC)] != MAGIC
+        or data[len(MAGIC)] != TABLE_VERSION
+        or int.from_bytes(data[len(MAGIC) + 1:HEADER_SIZE], "little")
+        != zlib.crc32(data[HEADER_SIZE:])
+    ):
+        data.close()
+        return None
+    return data
+
+
+_table = None
+_table_loaded = False
+
+
+def get_table():
+    global _table, _table_loaded
+    if not _table_loaded:
+        _table = load_table()
+        _table_loaded = True
+    return _table
+
+
+def best_move(board):
+    table = get_table()
+    if table is not None:
+        ai_bits, human_bits = bitboard_engine.to_bitboards(board)
+        move = table[HEADER_SIZE + position_index(ai_bits, human_bits)]
+        if move != NO_MOVE:
+            return move
+    return bitboard_engine.best_move(board)
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else TABLE_PATH
+    size = build_table(path)
+    print(f"Wrote {size} bytes to {path}")
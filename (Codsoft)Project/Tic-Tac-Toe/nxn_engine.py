@@ -0,0 +1,545 @@
+"""Board-size-independent engine for N x N, K-in-a-row games.
+
+Full minimax is only feasible on 3x3, so this engine runs an alpha-beta
+negamax under iterative deepening with a hard time budget: it returns the
+best move of the deepest fully searched iteration. Non-terminal leaves are
+scored by a window heuristic (every run of K cells that holds pieces of one
+side only is worth 10**count to that side), kept up to date incrementally as
+moves are made and unmade. Moves are ordered immediate wins, then blocks,
+then by threat value, with killer moves, history scores and closeness to
+the centre breaking ties. A winning move or forced blocks are searched alone.
+
+With parallel=True the root moves of each iteration are split across a
+process pool: the first (best-ordered) move is searched locally to get a
+bound, the rest are searched by the workers against that bound, and the
+results are merged in move order so the chosen move matches the serial
+search exactly. A cancelled parallel search returns without waiting for the
+workers, and tells them to stop through a counter in shared memory.
+
+The board is the same flat list of 'X' / 'O' / ' ' cells the GUI uses.
+"""
+
+import itertools
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from functools import lru_cache
+
+HUMAN = 'X'
+AI = 'O'
+EMPTY = ' '
+
+DEFAULT_TIME_LIMIT = 0.2
+
+# How often a parallel search checks its cancel_event while waiting on workers
+PARALLEL_POLL_INTERVAL = 0.01
+
+_EMPTY, _AI, _HUMAN = 0, 1, 2
+_OPPONENT = (0, _HUMAN, _AI)
+_CODES = {EMPTY: _EMPTY, AI: _AI, HUMAN: _HUMAN}
+
+
+class Geometry:
+    """Precomputed winning windows for one (size, k) combination."""
+
+    def __init__(self, size, k):
+        if not 1 <= k <= size:
+            raise ValueError(f"k must be between 1 and {size}, got {k}")
+        self.size = size
+        self.k = k
+        self.cells = size * size
+
+        lines = []
+        for row in range(size):
+            for col in range(size):
+                for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_row = row + d_row * (k - 1)
+                    end_col = col + d_col * (k - 1)
+                    if 0 <= end_row < size and 0 <= end_col < size:
+                        lines.append(tuple(
+                            (row + d_row * j) * size + col + d_col * j for j in range(k)
+                        ))
+        self.lines = tuple(lines)
+
+        cell_lines = [[] for _ in range(self.cells)]
+        for w, line in enumerate(self.lines):
+            for cell in line:
+                cell_lines[cell].append(w)
+        self.cell_lines = tuple(tuple(ws) for ws in cell_lines)
+
+        # Window value by piece count; a full window is a win and handled separately
+        self.weights = tuple(10 ** c if c else 0 for c in range(k + 1))
+        self.win_score = 10 * len(self.lines) * 10 ** k
+
+        center = (size - 1) / 2
+        self.center_rank = tuple(
+            -(abs(i // size - center) + abs(i % size - center)) for i in range(self.cells)
+        )
+
+        # On big boards only cells within two steps of a piece are worth trying
+        self.neighbours = None if size <= 7 else tuple(
+            tuple(
+                r * size + c
+                for r in range(max(0, i // size - 2), min(size, i // size + 3))
+                for c in range(max(0, i % size - 2), min(size, i % size + 3))
+                if r * size + c != i
+            )
+            for i in range(self.cells)
+        )
+
+
+@lru_cache(maxsize=None)
+def get_geometry(size, k):
+    return Geometry(size, k)
+
+
+def default_k(size):
+    return min(size, 5)
+
+
+def get_winner(board, size, k):
+    for line in get_geometry(size, k).lines:
+        first = board[line[0]]
+        if first != EMPTY and all(board[cell] == first for cell in line):
+            return first
+    return None
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Searcher:
+    def __init__(self, board, size, k, deadline=None, cancel_event=None, instrument=None,
+                 heuristics=True):
+        g = get_geometry(size, k)
+        if len(board) != g.cells:
+            raise ValueError(f"expected {g.cells} cells for a {size}x{size} board, got {len(board)}")
+        self.geometry = g
+        self.deadline = deadline
+        self.cancel_event = cancel_event
+        self.instrument = instrument
+        self.nodes = 0
+        # Killer moves (two per ply) and history scores (per player and cell)
+        # survive between iterative-deepening iterations of one best_move call.
+        self.heuristics = heuristics
+        self.killers = [[None, None] for _ in range(g.cells + 1)]
+        self.history = [None, [0] * g.cells, [0] * g.cells]
+        self.cells = [_CODES[cell] for cell in board]
+        self.empty_count = self.cells.count(_EMPTY)
+        # counts[player][w] = pieces of `player` in window w
+        self.counts = [None, [0] * len(g.lines), [0] * len(g.lines)]
+        for w, line in enumerate(g.lines):
+            for cell in line:
+                player = self.cells[cell]
+                if player:
+                    self.counts[player][w] += 1
+        self.score = sum(self.window_value(w) for w in range(len(g.lines)))
+
+    def window_value(self, w):
+        ai = self.counts[_AI][w]
+        human = self.counts[_HUMAN][w]
+        if ai and human:
+            return 0
+        if ai:
+            return self.geometry.weights[ai]
+        return -self.geometry.weights[human]
+
+    def place(self, cell, player):
+        """Play `cell` for `player`; return True if the move completes a line."""
+        g = self.geometry
+        own = self.counts[player]
+        won = False
+        delta = 0
+        for w in g.cell_lines[cell]:
+            before = self.window_value(w)
+            own[w] += 1
+            if own[w] == g.k:
+                won = True
+            delta += self.window_value(w) - before
+        self.cells[cell] = player
+        self.empty_count -= 1
+        self.score += delta
+        return won
+
+    def remove(self, cell, player):
+        g = self.geometry
+        own = self.counts[player]
+        delta = 0
+        for w in g.cell_lines[cell]:
+            before = self.window_value(w)
+            own[w] -= 1
+            delta += self.window_value(w) - before
+        self.cells[cell] = _EMPTY
+        self.empty_count += 1
+        self.score += delta
+
+    def evaluate(self, player):
+        return self.score if player == _AI else -self.score
+
+    def candidate_moves(self):
+        cells = self.cells
+        g = self.geometry
+        if g.neighbours is None or self.empty_count == g.cells:
+            moves = [i for i in range(g.cells) if cells[i] == _EMPTY]
+            if g.neighbours is not None:
+                # Empty big board: only the centre matters
+                moves = [max(moves, key=g.center_rank.__getitem__)]
+            return moves
+        moves = set()
+        for i in range(g.cells):
+            if cells[i] != _EMPTY:
+                for j in g.neighbours[i]:
+                    if cells[j] == _EMPTY:
+                        moves.add(j)
+        return sorted(moves)
+
+    def move_priority(self, cell, player, killers=(None, None), history=None):
+        g = self.geometry
+        own = self.counts[player]
+        other = self.counts[_OPPONENT[player]]
+        win = block = threat = 0
+        for w in g.cell_lines[cell]:
+            if not other[w]:
+                if own[w] == g.k - 1:
+                    win = 1
+                threat += g.weights[own[w] + 1]
+            if not own[w]:
+                if other[w] == g.k - 1:
+                    block = 1
+                threat += g.weights[other[w] + 1]
+        if killers[0] == cell:
+            killer = 2
+        elif killers[1] == cell:
+            killer = 1
+        else:
+            killer = 0
+        return (win, block, threat, killer, history[cell] if history else 0, g.center_rank[cell])
+
+    def ordered_moves(self, player, ply=None):
+        """Candidate moves, best first: wins, blocks, threats, killers, history, centre.
+
+        Without a `ply` (the root) killers and history are ignored, so the root
+        order - and with it the tie-break - is the same for serial and
+        parallel searches.
+        """
+        moves = self.candidate_moves()
+        if self.heuristics and ply is not None:
+            killers = self.killers[ply]
+            history = self.history[player]
+            keyed = [(self.move_priority(cell, player, killers, history), cell) for cell in moves]
+        else:
+            keyed = [(self.move_priority(cell, player), cell) for cell in moves]
+        keyed.sort(key=lambda item: item[0], reverse=True)
+        if keyed and self.heuristics:
+            top = keyed[0][0]
+            if top[0]:
+                return [keyed[0][1]]  # a winning move needs no alternatives
+            if top[1]:
+                # The opponent threatens to win: anything but a block loses at once
+                return [cell for key, cell in keyed if key[1]]
+        return [cell for _, cell in keyed]
+
+    def record_cutoff(self, move, player, depth, ply):
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[player][move] += depth * depth
+
+    def negamax(self, depth, alpha, beta, player, ply):
+        self.nodes += 1
+        instrument = self.instrument
+        if instrument is not None:
+            instrument.enter(ply)
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeout
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise SearchTimeout
+        if depth == 0:
+            return self.evaluate(player)
+
+        opponent = _OPPONENT[player]
+        best = -self.geometry.win_score * 2
+        cutoff = False
+        tried = 0
+        for move in self.ordered_moves(player, ply):
+            tried += 1
+            leaf = True
+            if self.place(move, player):
+                value = self.geometry.win_score - ply
+            elif self.empty_count == 0:
+                value = 0
+            else:
+                value = -self.negamax(depth - 1, -beta, -alpha, opponent, ply + 1)
+                leaf = False
+            self.remove(move, player)
+            if value > best:
+                best = value
+                if value > alpha:
+                    alpha = value
+                    if instrument is not None:
+                        instrument.update_pv(ply, move, leaf)
+                    if alpha >= beta:
+                        cutoff = True
+                        if self.heuristics:
+                            self.record_cutoff(move, player, depth, ply)
+                        break
+        if instrument is not None:
+            instrument.expanded(ply, tried, cutoff)
+        return best
+
+    def root_moves(self, first=None):
+        moves = self.ordered_moves(_AI)
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def root_value(self, move, depth, alpha):
+        """Value of the AI playing `move`; exact when above `alpha`, else an upper bound."""
+        leaf = True
+        if self.place(move, _AI):
+            value = self.geometry.win_score
+        elif self.empty_count == 0:
+            value = 0
+        else:
+            value = -self.negamax(depth - 1, -self.geometry.win_score * 2, -alpha, _HUMAN, 1)
+            leaf = False
+        self.remove(move, _AI)
+        if self.instrument is not None and value > alpha:
+            self.instrument.update_pv(0, move, leaf)
+        return value
+
+    def start_root(self):
+        if self.instrument is not None:
+            self.instrument.enter(0)
+
+    def search_root(self, depth, first=None):
+        """Return (move, value) for the AI at a fixed depth."""
+        moves = self.root_moves(first)
+        self.start_root()
+        alpha = -self.geometry.win_score * 2
+        best_move = moves[0]
+        for move in moves:
+            value = self.root_value(move, depth, alpha)
+            if value > alpha:
+                alpha = value
+                best_move = move
+        if self.instrument is not None:
+            self.instrument.expanded(0, len(moves), False)
+        return best_move, alpha
+
+    def search_root_parallel(self, depth, pool, first=None):
+        """Same result as search_root, with all but the first move searched in `pool`."""
+        moves = self.root_moves(first)
+        self.start_root()
+        best_move = moves[0]
+        alpha = self.root_value(best_move, depth, -self.geometry.win_score * 2)
+        if len(moves) == 1:
+            return best_move, alpha
+
+        board = [_SYMBOLS[code] for code in self.cells]
+        g = self.geometry
+        remaining = None if self.deadline is None else self.deadline - time.perf_counter()
+        ticket = next(_tickets)
+        futures = [
+            pool.submit(_root_move_value, board, g.size, g.k, move, depth, alpha, remaining,
+                        self.heuristics, ticket)
+            for move in moves[1:]
+        ]
+        try:
+            # Every worker shares the first move's bound, so a value above it
+            # is exact; scanning in move order keeps the serial tie-break.
+            for move, future in zip(moves[1:], futures):
+                value, nodes = self.wait_for(future)
+                self.nodes += nodes
+                if value is None:
+                    raise SearchTimeout
+                if value > alpha:
+                    alpha = value
+                    best_move = move
+                    if self.instrument is not None:
+                        # Workers don't report their lines, only the move
+                        self.instrument.pv_table[0] = [move]
+        finally:
+            for future in futures:
+                future.cancel()
+            _cancel_tickets(ticket)  # stops any worker still running
+        return best_move, alpha
+
+    def wait_for(self, future):
+        """future.result(), raising SearchTimeout as soon as the search is cancelled."""
+        while True:
+            if self.cancel_event is not None and self.cancel_event.is_set():
+                raise SearchTimeout
+            try:
+                return future.result(timeout=PARALLEL_POLL_INTERVAL)
+            except FutureTimeout:
+                pass
+
+
+_SYMBOLS = (EMPTY, AI, HUMAN)
+
+# Each parallel root search gets a ticket; once it is done or abandoned every
+# ticket up to and including its own is marked cancelled in `_cancelled`,
+# which the pool workers share. Tickets only grow, so a newer search is never
+# stopped by an older one finishing; two parallel searches only overlap
+# while a cancelled one winds down (a GUI restart).
+_tickets = itertools.count(1)
+_cancelled = None
+_cancelled_lock = threading.Lock()
+
+
+def _cancel_tickets(ticket):
+    with _cancelled_lock:
+        if _cancelled is not None and _cancelled.value < ticket:
+            _cancelled.value = ticket
+
+
+class _TicketCancelled:
+    """Stands in for a cancel_event inside a pool worker."""
+
+    def __init__(self, ticket):
+        self.ticket = ticket
+
+    def is_set(self):
+        return _cancelled is not None and _cancelled.value >= self.ticket
+
+
+def _init_worker(cancelled):
+    global _cancelled
+    _cancelled = cancelled
+
+
+def _root_move_value(board, size, k, move, depth, alpha, time_left, heuristics=True, ticket=None):
+    """Process-pool task: (value of one root move or None on timeout, nodes searched)."""
+    deadline = None if time_left is None else time.perf_counter() + time_left
+    cancel_event = None if ticket is None else _TicketCancelled(ticket)
+    searcher = Searcher(board, size, k, deadline, cancel_event, heuristics=heuristics)
+    try:
+        value = searcher.root_value(move, depth, alpha)
+    except SearchTimeout:
+        value = None
+    return value, searcher.nodes
+
+
+_pool = None
+_pool_workers = None
+
+
+def get_pool(workers=None):
+    """Return the shared process pool, (re)creating it for `workers` processes."""
+    global _pool, _pool_workers, _cancelled
+    workers = workers or os.cpu_count() or 1
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+        # spawn, not fork: the GUI calls this from a worker thread next to Tk
+        context = multiprocessing.get_context("spawn")
+        if _cancelled is None:
+            # Read by the workers at every node, so no lock
+            _cancelled = context.RawValue("q", 0)
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                    initializer=_init_worker, initargs=(_cancelled,))
+        _pool_workers = workers
+    return _pool
+
+
+def best_move(board, size, k=None, time_limit=DEFAULT_TIME_LIMIT, max_depth=None,
+              cancel_event=None, parallel=False, workers=None, result=None, instrument=None,
+              heuristics=True):
+    """Return the AI's move found within `time_limit` seconds (-1 if the board is full).
+
+    Setting `cancel_event` (a threading.Event) stops the search early, the
+    same way running out of time does. parallel=True splits each iteration's
+    root moves over `workers` processes (default: one per CPU). If a dict is
+    passed as `result`, the nodes searched and the last completed depth are
+    stored in it. For the full per-depth breakdown pass a
+    search_stats.SearchStats as `instrument`. heuristics=False turns off
+    killer/history ordering and forced-move pruning, for comparison.
+    """
+    k = default_k(size) if k is None else k
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+    searcher = Searcher(board, size, k, deadline, cancel_event, instrument, heuristics)
+    if searcher.empty_count == 0:
+        return -1
+
+    geometry = searcher.geometry
+    limit = searcher.empty_count if max_depth is None else min(max_depth, searcher.empty_count)
+    pool = get_pool(workers) if parallel else None
+    move = searcher.ordered_moves(_AI)[0]
+    completed = 0
+    for depth in range(1, limit + 1):
+        if instrument is not None:
+            instrument.start_depth()
+        try:
+            if pool is None:
+                move, value = searcher.search_root(depth, first=move)
+            else:
+                move, value = searcher.search_root_parallel(depth, pool, first=move)
+        except SearchTimeout:
+            break
+        completed = depth
+        if instrument is not None:
+            instrument.finish_depth(depth, move, value)
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        if abs(value) >= geometry.win_score - geometry.cells:
+            break  # forced result found, deeper search can't change it
+    if result is not None:
+        result["nodes"] = searcher.nodes
+        result["depth"] = completed
+    return move
+
+
+def _benchmark(argv):
+    import argparse
+    import random
+
+    parser = argparse.ArgumentParser(description="Compare serial and parallel root search")
+    parser.add_argument("--size", type=int, default=5)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--positions", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    positions = []
+    for _ in range(args.positions):
+        board = [EMPTY] * (args.size * args.size)
+        for i, cell in enumerate(rng.sample(range(len(board)), 4)):
+            board[cell] = HUMAN if i % 2 == 0 else AI
+        positions.append(board)
+
+    # Start the worker processes outside the timed region
+    best_move(positions[0], args.size, args.k, time_limit=None, max_depth=2,
+              parallel=True, workers=args.workers)
+    timings = {}
+    for parallel in (False, True):
+        start = time.perf_counter()
+        moves = [
+            best_move(board, args.size, args.k, time_limit=None, max_depth=args.depth,
+                      parallel=parallel, workers=args.workers)
+            for board in positions
+        ]
+        timings[parallel] = (time.perf_counter() - start, moves)
+
+    serial_time, serial_moves = timings[False]
+    parallel_time, parallel_moves = timings[True]
+    print(f"{args.size}x{args.size}, k={args.k}, depth {args.depth}, {args.positions} positions, "
+          f"{_pool_workers} workers")
+    print(f"serial:   {serial_time:.3f}s")
+    print(f"parallel: {parallel_time:.3f}s")
+    print(f"speedup:  {serial_time / parallel_time:.2f}x")
+    print("moves match" if serial_moves == parallel_moves else "MOVES DIFFER")
+    return 0 if serial_moves == parallel_moves else 1
+
+
+if __name__ == "__main__":
+    sys.exit(_benchmark(sys.argv[1:]))
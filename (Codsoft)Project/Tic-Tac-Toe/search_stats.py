@@ -0,0 +1,120 @@
+"""Optional instrumentation for the N x N engine's search.
+
+Pass a SearchStats to nxn_engine.best_move(..., instrument=stats) to record
+nodes and alpha-beta cutoffs per ply, moves tried per node (branching
+factor), time and node count per iterative-deepening depth, and the
+principal variation. Without it the searcher only pays one `is None` check
+per node.
+"""
+
+import logging
+import time
+
+logger = logging.getLogger("tictactoe.search")
+
+
+class SearchStats:
+    def __init__(self):
+        self.nodes_by_ply = []
+        self.cutoffs_by_ply = []
+        self.moves_by_ply = []
+        self.expanded_by_ply = []
+        self.depths = []
+        self.pv_table = []
+        self.pv = []
+        self.move = None
+        self.value = None
+        self._depth_start = None
+        self._depth_nodes = 0
+
+    def _grow(self, ply):
+        while len(self.nodes_by_ply) <= ply + 1:
+            self.nodes_by_ply.append(0)
+            self.cutoffs_by_ply.append(0)
+            self.moves_by_ply.append(0)
+            self.expanded_by_ply.append(0)
+            self.pv_table.append([])
+
+    # ---- hooks called by the searcher ----
+
+    def start_depth(self):
+        self._depth_start = time.perf_counter()
+        self._depth_nodes = sum(self.nodes_by_ply)
+
+    def enter(self, ply):
+        if ply + 1 >= len(self.nodes_by_ply):
+            self._grow(ply)
+        self.nodes_by_ply[ply] += 1
+        self.pv_table[ply] = []
+
+    def update_pv(self, ply, move, leaf):
+        # `leaf`: the move ended the game, so nothing below it is valid
+        self.pv_table[ply] = [move] if leaf else [move] + self.pv_table[ply + 1]
+
+    def expanded(self, ply, moves_tried, cutoff):
+        self.expanded_by_ply[ply] += 1
+        self.moves_by_ply[ply] += moves_tried
+        if cutoff:
+            self.cutoffs_by_ply[ply] += 1
+
+    def finish_depth(self, depth, move, value):
+        elapsed = time.perf_counter() - self._depth_start
+        nodes = sum(self.nodes_by_ply) - self._depth_nodes
+        self.move = move
+        self.value = value
+        self.pv = list(self.pv_table[0]) if self.pv_table else [move]
+        self.depths.append({
+            "depth": depth,
+            "nodes": nodes,
+            "time_ms": 1000 * elapsed,
+            "move": move,
+            "value": value,
+            "pv": self.pv,
+        })
+        logger.debug("depth %d: move %d value %d, %d nodes in %.1f ms, pv %s",
+                     depth, move, value, nodes, 1000 * elapsed, self.pv)
+
+    # ---- reporting ----
+
+    @property
+    def nodes(self):
+        return sum(self.nodes_by_ply)
+
+    @property
+    def depth(self):
+        return self.depths[-1]["depth"] if self.depths else 0
+
+    def branching_factor(self):
+        """Average number of moves tried at each expanded node."""
+        expanded = sum(self.expanded_by_ply)
+        return sum(self.moves_by_ply) / expanded if expanded else 0.0
+
+    def effective_branching_factor(self):
+        """Growth in nodes between the last two completed depths."""
+        if len(self.depths) < 2 or not self.depths[-2]["nodes"]:
+            return None
+        return self.depths[-1]["nodes"] / self.depths[-2]["nodes"]
+
+    def as_dict(self):
+        return {
+            "move": self.move,
+            "value": self.value,
+            "depth": self.depth,
+            "nodes": self.nodes,
+            "nodes_by_ply": self.nodes_by_ply,
+            "cutoffs_by_ply": self.cutoffs_by_ply,
+            "branching_factor": self.branching_factor(),
+            "effective_branching_factor": self.effective_branching_factor(),
+            "depths": self.depths,
+            "pv": self.pv,
+        }
+
+    def summary(self):
+        total_ms = sum(d["time_ms"] for d in self.depths)
+        text = f"depth {self.depth}, {self.nodes:,} nodes, {total_ms:.0f} ms, bf {self.branching_factor():.1f}"
+        if self.pv:
+            text += ", pv " + " ".join(str(m) for m in self.pv[:6])
+        return text
+
+    def log(self, level=logging.INFO):
+        logger.log(level, "search: %s", self.summary())
@@ -0,0 +1,235 @@
+"""Headless self-play and benchmark harness for the Tic-Tac-Toe engines.
+
+Plays N games between an engine and an opponent without importing tkinter
+and reports outcomes, per-move latency percentiles and transposition-table
+hit rates. Nodes searched (and nodes/sec) are only reported for the nxn
+engine, the one engine instrumented with search_stats.SearchStats.
+
+Examples:
+    python selfplay.py --games 200 --engine bitboard --opponent random
+    python selfplay.py --engine table --opponent scripted --json results.json
+    python selfplay.py --engine nxn --opponent random --size 5 --k 4 --games 10
+
+The exit code is 1 when --assert-no-loss is given and the engine lost a game.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+import bitboard_engine
+import move_table
+import nxn_engine
+from search_stats import SearchStats
+from transposition import TranspositionTable
+
+HUMAN = 'X'
+AI = 'O'
+EMPTY = ' '
+
+ENGINES = ("table", "bitboard", "bitboard-notable", "nxn")
+OPPONENTS = ENGINES + ("random", "scripted")
+
+# Opening sequences played by the "scripted" opponent before it hands over to
+# perfect play; indices are cells of the 3x3 board, in the opponent's moves.
+SCRIPTED_OPENINGS = (
+    (4,), (0,), (1,), (2,), (3,), (5,), (6,), (7,), (8,),
+    (0, 8), (0, 5), (4, 8), (1, 3), (1, 6), (2, 6),
+)
+
+
+def swap_sides(board):
+    return [AI if cell == HUMAN else HUMAN if cell == AI else EMPTY for cell in board]
+
+
+class Player:
+    """Chooses moves for one side; engines always think they are playing AI."""
+
+    def __init__(self, kind, size, k, rng, time_limit, opening=()):
+        self.kind = kind
+        self.size = size
+        self.k = k
+        self.rng = rng
+        self.time_limit = time_limit
+        self.opening = list(opening)
+        self.table = TranspositionTable() if kind == "bitboard" else None
+        # Only the nxn engine counts the nodes it visits
+        self.nodes = 0 if kind == "nxn" else None
+        self.search_time = 0.0
+        self.latencies = []
+
+    def choose(self, board, symbol):
+        view = board if symbol == AI else swap_sides(board)
+        empty = [i for i, cell in enumerate(board) if cell == EMPTY]
+
+        if self.kind == "random":
+            return self.rng.choice(empty)
+        if self.kind == "scripted":
+            while self.opening:
+                move = self.opening.pop(0)
+                if board[move] == EMPTY:
+                    return move
+            return bitboard_engine.best_move(view, table=None)
+
+        start = time.perf_counter()
+        if self.kind == "table":
+            move = move_table.best_move(view)
+        elif self.kind == "bitboard":
+            move = bitboard_engine.best_move(view, table=self.table)
+        elif self.kind == "bitboard-notable":
+            move = bitboard_engine.best_move(view, table=None)
+        else:
+            instrument = SearchStats()
+            move = nxn_engine.best_move(view, self.size, self.k, time_limit=self.time_limit,
+                                        instrument=instrument)
+            self.nodes += instrument.nodes
+        elapsed = time.perf_counter() - start
+        self.search_time += elapsed
+        self.latencies.append(elapsed)
+        return move
+
+
+def winner_of(board, size, k):
+    if size == 3 and k == 3:
+        ai_bits, human_bits = bitboard_engine.to_bitboards(board)
+        return bitboard_engine.get_winner(ai_bits, human_bits)
+    return nxn_engine.get_winner(board, size, k)
+
+
+def play_game(engine, opponent, engine_symbol, size, k):
+    board = [EMPTY] * (size * size)
+    players = {engine_symbol: engine, (HUMAN if engine_symbol == AI else AI): opponent}
+    turn = HUMAN  # X always moves first
+    moves = []
+    while True:
+        winner = winner_of(board, size, k)
+        if winner is not None or EMPTY not in board:
+            return winner, moves
+        move = players[turn].choose(board, turn)
+        if not 0 <= move < len(board) or board[move] != EMPTY:
+            raise RuntimeError(f"{players[turn].kind} played illegal move {move} on {board}")
+        board[move] = turn
+        moves.append(move)
+        turn = AI if turn == HUMAN else HUMAN
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def run(args):
+    if args.size != 3 or args.k not in (None, 3):
+        for kind in (args.engine, args.opponent):
+            if kind not in ("nxn", "random"):
+                raise SystemExit(f"{kind!r} only plays 3x3; use nxn or random for bigger boards")
+    k = args.k if args.k is not None else nxn_engine.default_k(args.size)
+    rng = random.Random(args.seed)
+
+    engine = Player(args.engine, args.size, k, rng, args.time_limit)
+    opponents = []
+    outcomes = {"win": 0, "loss": 0, "draw": 0}
+    lost_games = []
+
+    start = time.perf_counter()
+    for game in range(args.games):
+        opening = SCRIPTED_OPENINGS[game % len(SCRIPTED_OPENINGS)] if args.opponent == "scripted" else ()
+        opponent = Player(args.opponent, args.size, k, rng, args.time_limit, opening)
+        opponents.append(opponent)
+        engine_symbol = HUMAN if game % 2 == 0 else AI
+        winner, moves = play_game(engine, opponent, engine_symbol, args.size, k)
+        if winner is None:
+            outcomes["draw"] += 1
+        elif winner == engine_symbol:
+            outcomes["win"] += 1
+        else:
+            outcomes["loss"] += 1
+            lost_games.append({"game": game, "engine_plays": engine_symbol, "moves": moves})
+    wall_time = time.perf_counter() - start
+
+    latencies = sorted(engine.latencies)
+    report = {
+        "engine": args.engine,
+        "opponent": args.opponent,
+        "size": args.size,
+        "k": k,
+        "games": args.games,
+        "seed": args.seed,
+        "outcomes": outcomes,
+        "lost_games": lost_games,
+        "wall_time_s": wall_time,
+        "engine_moves": len(latencies),
+        "nodes": engine.nodes,
+        "nodes_per_sec": (engine.nodes / engine.search_time
+                          if engine.nodes is not None and engine.search_time else None),
+        "latency_ms": {
+            "mean": 1000 * sum(latencies) / len(latencies) if latencies else None,
+            "p50": 1000 * percentile(latencies, 50) if latencies else None,
+            "p95": 1000 * percentile(latencies, 95) if latencies else None,
+            "p99": 1000 * percentile(latencies, 99) if latencies else None,
+            "max": 1000 * latencies[-1] if latencies else None,
+        },
+    }
+    if engine.table is not None:
+        report["transposition_table"] = engine.table.stats()
+    if args.engine == "table":
+        report["move_table_loaded"] = move_table.get_table() is not None
+    return report
+
+
+def print_report(report):
+    o = report["outcomes"]
+    lat = report["latency_ms"]
+    print(f"{report['engine']} vs {report['opponent']} on {report['size']}x{report['size']} "
+          f"(k={report['k']}), {report['games']} games in {report['wall_time_s']:.2f}s")
+    print(f"  outcomes: {o['win']} won, {o['draw']} drawn, {o['loss']} lost")
+    if lat["p50"] is not None:
+        print(f"  latency:  p50 {lat['p50']:.3f} ms, p95 {lat['p95']:.3f} ms, "
+              f"p99 {lat['p99']:.3f} ms, max {lat['max']:.3f} ms over {report['engine_moves']} moves")
+    if report["nodes"] is not None:
+        rate = f" ({report['nodes_per_sec']:.0f}/s)" if report["nodes_per_sec"] is not None else ""
+        print(f"  nodes:    {report['nodes']}{rate}")
+    if "transposition_table" in report:
+        tt = report["transposition_table"]
+        print(f"  tt:       {tt['hits'] + tt['misses']} probes, {tt['hit_rate']:.1%} hit rate, "
+              f"{tt['size']} entries, {tt['evictions']} evictions")
+    if "move_table_loaded" in report:
+        print(f"  table:    {'loaded' if report['move_table_loaded'] else 'missing, fell back to search'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless Tic-Tac-Toe self-play benchmark")
+    parser.add_argument("--engine", choices=ENGINES, default="table", help="engine under test")
+    parser.add_argument("--opponent", choices=OPPONENTS, default="random")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--k", type=int, default=None)
+    parser.add_argument("--time-limit", type=float, default=nxn_engine.DEFAULT_TIME_LIMIT,
+                        help="per-move budget for the nxn engine, in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="write the report as JSON ('-' for stdout)")
+    parser.add_argument("--assert-no-loss", action="store_true",
+                        help="exit with status 1 if the engine loses any game")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    if args.assert_no_loss and report["outcomes"]["loss"]:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import pytest
+
+import bitboard_engine
+import move_table
+
+
+def to_board(ai_bits, human_bits):
+    return [
+        bitboard_engine.AI if ai_bits >> i & 1 else
+        bitboard_engine.HUMAN if human_bits >> i & 1 else
+        bitboard_engine.EMPTY
+        for i in range(9)
+    ]
+
+
+@pytest.fixture(scope="module")
+def table(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("table") / "perfect_play.bin")
+    move_table.build_table(path)
+    data = move_table.load_table(path)
+    assert data is not None
+    yield data
+    data.close()
+
+
+def stored_move(table, board):
+    ai_bits, human_bits = bitboard_engine.to_bitboards(board)
+    return table[move_table.HEADER_SIZE + move_table.position_index(ai_bits, human_bits)]
+
+
+@pytest.mark.parametrize("ai_opens", [True, False])
+def test_every_ai_to_move_position_is_in_the_table(table, ai_opens):
+    checked = 0
+    for ai_bits, human_bits in move_table.reachable_positions():
+        ai_count, human_count = bin(ai_bits).count("1"), bin(human_bits).count("1")
+        if ai_opens != (ai_count == human_count):
+            continue
+        board = to_board(ai_bits, human_bits)
+        move = stored_move(table, board)
+        assert move != move_table.NO_MOVE, board
+        assert move == bitboard_engine.best_move(board), board
+        checked += 1
+    assert checked == (2423 if ai_opens else 2097)
+
+
+def test_human_opening_is_answered_from_the_table(table):
+    board = [bitboard_engine.HUMAN] + [bitboard_engine.EMPTY] * 8
+    assert stored_move(table, board) == bitboard_engine.best_move(board)
+
+
+def test_stale_version_is_rejected(tmp_path):
+    path = str(tmp_path / "perfect_play.bin")
+    move_table.build_table(path)
+    with open(path, "r+b") as f:
+        f.seek(len(move_table.MAGIC))
+        f.write(bytes([move_table.TABLE_VERSION - 1]))
+    assert move_table.load_table(path) is None
@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+import nxn_engine
+from nxn_engine import AI, EMPTY, HUMAN
+from search_stats import SearchStats
+
+
+def opening(size, cells):
+    board = [EMPTY] * (size * size)
+    for i, cell in enumerate(cells):
+        board[cell] = HUMAN if i % 2 == 0 else AI
+    return board
+
+
+POSITIONS = [
+    (4, 3, opening(4, [5])),
+    (5, 4, opening(5, [12, 6, 7])),
+    (7, 5, opening(7, [24])),
+]
+
+
+@pytest.mark.parametrize("size, k, board", POSITIONS)
+def test_result_dict_and_instrument(size, k, board):
+    result = {}
+    instrument = SearchStats()
+    move = nxn_engine.best_move(board, size, k, time_limit=None, max_depth=3,
+                                result=result, instrument=instrument)
+    assert board[move] == EMPTY
+    assert result["depth"] == 3
+    assert result["nodes"] > 0
+    assert [d["depth"] for d in instrument.depths] == [1, 2, 3]
+    assert instrument.move == move
+
+
+@pytest.mark.parametrize("size, k, board", POSITIONS)
+def test_parallel_matches_serial(size, k, board):
+    serial = nxn_engine.best_move(board, size, k, time_limit=None, max_depth=3)
+    parallel = nxn_engine.best_move(board, size, k, time_limit=None, max_depth=3,
+                                    parallel=True, workers=2)
+    assert parallel == serial
+
+
+class CancelAtDepth(SearchStats):
+    """Sets `event` shortly after the search starts iteration `depth`."""
+
+    def __init__(self, event, depth, delay=0.5):
+        super().__init__()
+        self.event = event
+        self.cancel_depth = depth
+        self.delay = delay
+        self.started = 0
+        self.cancelled_at = None
+        self.timer = None
+
+    def start_depth(self):
+        super().start_depth()
+        self.started += 1
+        if self.started == self.cancel_depth:
+            self.timer = threading.Timer(self.delay, self.cancel)
+            self.timer.start()
+
+    def cancel(self):
+        self.cancelled_at = time.perf_counter()
+        self.event.set()
+
+
+def test_cancelled_parallel_search_returns_promptly():
+    board = opening(7, [24])
+    cancel_event = threading.Event()
+    # Depth 6 on this position takes over ten seconds; three seconds in, the
+    # first move is done and the workers are busy with the rest. A search
+    # that only noticed the cancel between iterations would overrun by seconds.
+    instrument = CancelAtDepth(cancel_event, depth=6, delay=3.0)
+    result = {}
+    try:
+        # No time limit: only the cancel can end this search
+        move = nxn_engine.best_move(board, 7, 5, time_limit=None, cancel_event=cancel_event,
+                                    parallel=True, workers=2, result=result,
+                                    instrument=instrument)
+    finally:
+        if instrument.timer is not None:
+            instrument.timer.cancel()
+    assert board[move] == EMPTY
+    assert instrument.cancelled_at is not None
+    assert result["depth"] == 5
+    assert time.perf_counter() - instrument.cancelled_at < 5.0
+
+    # The workers gave up too, so the pool is free for the next search
+    start = time.perf_counter()
+    nxn_engine.best_move(board, 7, 5, time_limit=None, max_depth=2, parallel=True, workers=2,
+                         result=result)
+    assert result["depth"] == 2
+    assert time.perf_counter() - start < 5.0
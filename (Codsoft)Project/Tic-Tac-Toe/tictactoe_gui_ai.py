@@ -1,226 +1,42 @@
 import tkinter as tk
-import math
+import argparse
+import logging
+import queue
+import threading
+
+import move_table
+import nxn_engine
+from search_stats import SearchStats
 
 HUMAN = 'X'
 AI = 'O'
 EMPTY = ' '
 
-def create_board():
-    return [EMPTY] * 9
+# How often the GUI checks whether the AI worker has finished (ms)
+AI_POLL_MS = 15
 
-def get_winner(board):
-    win_positions = [
-        (0, 1, 2),
-        (3, 4, 5),
-        (6, 7, 8),
-        (0, 3, 6),
-        (1, 4, 7),
-        (2, 5, 8),
-        (0, 4, 8),
-        (2, 4, 6)
-    ]
-    for a, b, c in win_positions:
-        if board[a] == board[b] == board[c] != EMPTY:
-            return board[a]
-    return None
+def create_board(size=3):
+    return [EMPTY] * (size * size)
 
 def is_full(board):
     return all(cell != EMPTY for cell in board)
 
-def evaluate(board):
-    winner = get_winner(board)
-    if winner == AI:
-        return 1
-    elif winner == HUMAN:
-        return -1
-    return 0
-
-def minimax(board, depth, alpha, beta, is_maximizing):
-    score = evaluate(board)
-    if score == 1 or score == -1 or is_full(board):
-        return score
-
-    if is_maximizing:
-        max_eval = -math.inf
-        for i in range(9):
-            if board[i] == EMPTY:
-                board[i] = AI
-                eval_value = minimax(board, depth + 1, alpha, beta, False)
-                board[i] = EMPTY
-                max_eval = max(max_eval, eval_value)
-                alpha = max(alpha, eval_value)
-                if beta <= alpha:
-                    break
-        return max_eval
-    else:
-        min_eval = math.inf
-        for i in range(9):
-            if board[i] == EMPTY:
-                board[i] = HUMAN
-                eval_value = minimax(board, depth + 1, alpha, beta, True)
-                board[i] = EMPTY
-                min_eval = min(min_eval, eval_value)
-                beta = min(beta, eval_value)
-                if beta <= alpha:
-                    break
-        return min_eval
-
-def best_move(board):
-    best_val = -math.inf
-    move = -1
-    for i in range(9):
-        if board[i] == EMPTY:
-            board[i] = AI
-            move_val = minimax(board, 0, -math.inf, math.inf, False)
-            board[i] = EMPTY
-            if move_val > best_val:
-                best_val = move_val
-                move = i
-    return move
-
 class TicTacToeGUI:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Tic-Tac-Toe AI (Minimax)")
-        self.root.configure(bg="#041a2c")
-        self.root.resizable(False, False)
-
-        self.board = create_board()
-        self.buttons = []
-
-        main_frame = tk.Frame(root, bg="#d5e3f0", padx=15, pady=15, bd=2, relief="ridge")
-        main_frame.grid(row=0, column=0)
-
-        self.status_label = tk.Label(
-            main_frame,
-            text="You are X. Your turn!",
-            font=("Segoe UI", 13, "bold"),
-            bg="#b6cbe3",
-            fg="#2c3e50",
-            pady=8,
-            padx=10,
-            width=25
-        )
-        self.status_label.grid(row=0, column=0, columnspan=3, pady=(0, 10))
-
-        for i in range(9):
-            btn = tk.Button(
-                main_frame,
-                text="",
-                font=("Segoe UI", 22, "bold"),
-                width=4,
-                height=2,
-                bg="#f4f9ff",
-                activebackground="#cfe0f5",
-                relief="groove",
-                bd=3,
-                command=lambda idx=i: self.on_button_click(idx)
-            )
-            btn.grid(row=1 + (i // 3), column=i % 3, padx=7, pady=7)
-            self.buttons.append(btn)
-
-        self.restart_button = tk.Button(
-            main_frame,
-            text="⟳ Restart Game",
-            font=("Segoe UI", 11, "bold"),
-            bg="#aac6df",
-            fg="#1b2a41",
-            activebackground="#8fb7d5",
-            width=20,
-            pady=5,
-            command=self.restart_game
-        )
-        self.restart_button.grid(row=4, column=0, columnspan=3, pady=(12, 0))
-
-        self.game_over = False
-
-    def on_button_click(self, index):
-        if self.game_over:
-            return
-
-        if self.board[index] == EMPTY:
-            self.board[index] = HUMAN
-            self.update_buttons()
-
-            if self.check_game_state():
-                return
-
-            self.status_label.config(text="AI is thinking...")
-            self.root.update_idletasks()
-
-            ai_index = best_move(self.board)
-            if ai_index is not None:
-                self.board[ai_index] = AI
-                self.update_buttons()
-                self.check_game_state()
-
-    def update_buttons(self):
-        for i in range(9):
-            self.buttons[i].config(text=self.board[i])
-            if self.board[i] == HUMAN:
-                self.buttons[i].config(fg="#1565c0")
-            elif self.board[i] == AI:
-                self.buttons[i].config(fg="#c62828")
-
-    def check_game_state(self):
-        winner = get_winner(self.board)
-
-        if winner:
-            if winner == HUMAN:
-                self.status_label.config(text="🎉 You Win!")
-            elif winner == AI:
-                self.status_label.config(text="🤖 AI Wins!")
-
-            self.highlight_winner()
-            self.game_over = True
-            self.disable_all_buttons()
-            return True
-
-        elif is_full(self.board):
-            self.status_label.config(text="🤝 It's a Draw!")
-            self.game_over = True
-            self.disable_all_buttons()
-            return True
-
-        self.status_label.config(text="Your turn (X).")
-        return False
-
-    def highlight_winner(self):
-        win_positions = [
-            (0,1,2),(3,4,5),(6,7,8),
-            (0,3,6),(1,4,7),(2,5,8),
-            (0,4,8),(2,4,6)
-        ]
-
-        for a,b,c in win_positions:
-            if self.board[a] == self.board[b] == self.board[c] != EMPTY:
-                for idx in (a, b, c):
-                    self.buttons[idx].config(bg="#ffeb99")
-
-    def disable_all_buttons(self):
-        for btn in self.buttons:
-            btn.config(state=tk.DISABLED)
-
-    def enable_all_buttons(self):
-        for btn in self.buttons:
-            btn.config(state=tk.NORMAL)
-
-    def restart_game(self):
-        self.board = create_board()
-        self.game_over = False
-
-        for btn in self.buttons:
-            btn.config(text="", state=tk.NORMAL, bg="#f4f9ff")
-
-        self.status_label.config(text="New Game! You are X. Your turn!")
-
-    def __init__(self, root):
+    def __init__(self, root, size=3, k=None, time_limit=nxn_engine.DEFAULT_TIME_LIMIT,
+                 parallel=False, workers=None, show_stats=False):
         self.root = root
         self.root.title("Tic-Tac-Toe AI (Minimax)")
         self.root.resizable(False, False)
 
-        self.board = create_board()
+        self.size = size
+        self.k = nxn_engine.default_k(size) if k is None else k
+        self.time_limit = time_limit
+        self.parallel = parallel
+        self.workers = workers
+        self.show_stats = show_stats
+        self.board = create_board(size)
         self.buttons = []
+        cell_font = 20 if size <= 4 else max(8, 80 // size)
 
         self.status_label = tk.Label(
             root,
@@ -228,18 +44,18 @@ class TicTacToeGUI:
             font=("Segoe UI", 12, "bold"),
             pady=10
         )
-        self.status_label.grid(row=0, column=0, columnspan=3)
+        self.status_label.grid(row=0, column=0, columnspan=size)
 
-        for i in range(9):
+        for i in range(size * size):
             btn = tk.Button(
                 root,
                 text="",
-                font=("Segoe UI", 20, "bold"),
-                width=4,
-                height=2,
+                font=("Segoe UI", cell_font, "bold"),
+                width=4 if size <= 4 else 2,
+                height=2 if size <= 4 else 1,
                 command=lambda idx=i: self.on_button_click(idx)
             )
-            btn.grid(row=1 + (i // 3), column=i % 3, padx=5, pady=5)
+            btn.grid(row=1 + (i // size), column=i % size, padx=5 if size <= 4 else 1, pady=5 if size <= 4 else 1)
             self.buttons.append(btn)
 
         self.restart_button = tk.Button(
@@ -248,12 +64,19 @@ class TicTacToeGUI:
             font=("Segoe UI", 10, "bold"),
             command=self.restart_game
         )
-        self.restart_button.grid(row=4, column=0, columnspan=3, pady=(5, 10))
+        self.restart_button.grid(row=1 + size, column=0, columnspan=size, pady=(5, 10))
 
         self.game_over = False
 
+        # The AI searches in a worker thread; results come back through this
+        # queue and are picked up on the Tk thread by poll_ai_result().
+        self.ai_results = queue.Queue()
+        self.search_id = 0
+        self.cancel_event = None
+        self.thinking = False
+
     def on_button_click(self, index):
-        if self.game_over:
+        if self.game_over or self.thinking:
             return
 
         if self.board[index] == EMPTY:
@@ -264,16 +87,73 @@ class TicTacToeGUI:
                 return
 
             self.status_label.config(text="AI is thinking...")
-            self.root.update_idletasks()
-
-            ai_index = best_move(self.board)
-            if ai_index is not None and self.board[ai_index] == EMPTY:
-                self.board[ai_index] = AI
-                self.update_buttons()
-                self.check_game_state()
+            self.start_ai_search()
+
+    def start_ai_search(self):
+        self.thinking = True
+        self.search_id += 1
+        self.cancel_event = threading.Event()
+        worker = threading.Thread(
+            target=self.search_worker,
+            args=(list(self.board), self.search_id, self.cancel_event),
+            daemon=True
+        )
+        worker.start()
+        self.root.after(AI_POLL_MS, self.poll_ai_result)
+
+    def search_worker(self, board, search_id, cancel_event):
+        # Runs off the Tk thread: must not touch any widget
+        ai_index = None
+        stats = SearchStats() if self.show_stats else None
+        try:
+            ai_index = self.ai_move(board, cancel_event, stats)
+        finally:
+            self.ai_results.put((search_id, ai_index, stats))
+
+    def poll_ai_result(self):
+        while True:
+            try:
+                search_id, ai_index, stats = self.ai_results.get_nowait()
+            except queue.Empty:
+                if self.thinking:
+                    self.root.after(AI_POLL_MS, self.poll_ai_result)
+                return
+            if search_id == self.search_id:
+                break
+            # Result of a search cancelled by a restart: drop it
+
+        self.thinking = False
+        self.cancel_event = None
+        if ai_index is not None and self.board[ai_index] == EMPTY:
+            self.board[ai_index] = AI
+            self.update_buttons()
+            self.check_game_state()
+            if stats is not None and stats.depths:
+                stats.log()
+                text = self.status_label.cget("text")
+                self.status_label.config(text=f"{text}\nAI: {stats.summary()}")
+
+    def cancel_ai_search(self):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.cancel_event = None
+        self.search_id += 1
+        self.thinking = False
+
+    def ai_move(self, board, cancel_event=None, stats=None):
+        if self.size == 3 and self.k == 3 and stats is None:
+            return move_table.best_move(board)
+        return nxn_engine.best_move(
+            board, self.size, self.k,
+            time_limit=self.time_limit,
+            cancel_event=cancel_event,
+            parallel=self.parallel,
+            workers=self.workers,
+            instrument=stats
+        )
 
     def update_buttons(self):
-        for i in range(9):
+        for i in range(len(self.board)):
             self.buttons[i].config(text=self.board[i])
             if self.board[i] == HUMAN:
                 self.buttons[i].config(fg="#1e90ff")
@@ -281,7 +161,7 @@ class TicTacToeGUI:
                 self.buttons[i].config(fg="#e74c3c")
 
     def check_game_state(self):
-        winner = get_winner(self.board)
+        winner = nxn_engine.get_winner(self.board, self.size, self.k)
         if winner == HUMAN:
             self.status_label.config(text="You win! 🎉 (Rare!)")
             self.game_over = True
@@ -310,13 +190,31 @@ class TicTacToeGUI:
             btn.config(state=tk.NORMAL)
 
     def restart_game(self):
-        self.board = create_board()
+        self.cancel_ai_search()
+        self.board = create_board(self.size)
         self.game_over = False
         for btn in self.buttons:
             btn.config(text="", state=tk.NORMAL)
         self.status_label.config(text="New game! You are X. Your turn!")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tic-Tac-Toe against a minimax AI")
+    parser.add_argument("--size", type=int, default=3, help="board is SIZE x SIZE (default 3)")
+    parser.add_argument("--k", type=int, default=None, help="pieces in a row needed to win (default min(SIZE, 5))")
+    parser.add_argument("--time-limit", type=float, default=nxn_engine.DEFAULT_TIME_LIMIT,
+                        help="seconds the AI may think per move on non-3x3 games")
+    parser.add_argument("--parallel", action="store_true",
+                        help="split the AI's root moves across CPU cores on non-3x3 games")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for --parallel (default: one per CPU)")
+    parser.add_argument("--stats", action="store_true",
+                        help="show search statistics in the status bar and log them")
+    args = parser.parse_args()
+
+    if args.stats:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+
     root = tk.Tk()
-    app = TicTacToeGUI(root)
+    app = TicTacToeGUI(root, size=args.size, k=args.k, time_limit=args.time_limit,
+                       parallel=args.parallel, workers=args.workers, show_stats=args.stats)
     root.mainloop()
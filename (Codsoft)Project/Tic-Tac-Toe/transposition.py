@@ -0,0 +1,83 @@
+"""Transposition table for the bitboard engine.
+
+Positions are keyed by a canonical hash: the smallest encoding of the board
+over its 8 rotations/reflections, so symmetric positions share one entry.
+"""
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Cell permutations for the 8 symmetries of the 3x3 board (new cell -> old cell)
+_PERMUTATIONS = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),  # identity
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),  # rotate 90
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),  # rotate 180
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),  # rotate 270
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),  # mirror left-right
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),  # mirror top-bottom
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),  # main diagonal
+    (8, 5, 2, 7, 4, 1, 6, 3, 0),  # anti diagonal
+)
+
+
+def _permute_bits(bits, perm):
+    out = 0
+    for new, old in enumerate(perm):
+        if bits >> old & 1:
+            out |= 1 << new
+    return out
+
+
+# SYMMETRIES[s][bits] is the 9-bit pattern `bits` under symmetry s
+SYMMETRIES = tuple(
+    tuple(_permute_bits(bits, perm) for bits in range(512))
+    for perm in _PERMUTATIONS
+)
+
+
+def canonical_key(ai_bits, human_bits, is_maximizing):
+    key = min(s[ai_bits] << 9 | s[human_bits] for s in SYMMETRIES)
+    return key << 1 | is_maximizing
+
+
+class TranspositionTable:
+    def __init__(self, max_size=1 << 16):
+        self.max_size = max_size
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def store(self, key, value, flag):
+        entries = self.entries
+        if key not in entries and len(entries) >= self.max_size:
+            # Dicts keep insertion order, so this drops the oldest entry
+            del entries[next(iter(entries))]
+            self.evictions += 1
+        entries[key] = (value, flag)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        probes = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / probes if probes else 0.0,
+        }